@@ -0,0 +1,200 @@
+import numpy as np
+from leg_store import encode_direction, encode_option_type, payoff_kernel
+from piecewise_payoff import segment_roots
+
+class BatchStrategies():
+    # N strategies with varying leg counts in a ragged CSR layout:
+    # the legs of strategy i are rows offsets[i]:offsets[i+1] of the leg columns
+    def __init__(self, offsets, S, K, P, LorS, option_type):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.K = np.asarray(K, dtype=float).ravel()
+        n_legs = self.K.size
+        self.S = np.broadcast_to(np.asarray(S, dtype=float), n_legs)
+        self.P = np.broadcast_to(np.asarray(P, dtype=float), n_legs)
+        self.is_long = np.broadcast_to(encode_direction(LorS), n_legs)
+        self.is_call = np.broadcast_to(encode_option_type(option_type), n_legs)
+        if self.offsets[0] != 0 or self.offsets[-1] != n_legs or np.any(np.diff(self.offsets) < 0):
+            raise ValueError("Offsets must rise from 0 to the number of legs.")
+        self.leg_counts = np.diff(self.offsets)
+        self.strategy_index = np.repeat(np.arange(self.leg_counts.size), self.leg_counts)
+        self._segments = None
+
+    @classmethod
+    def from_strategies(cls, strategies):
+        # Each strategy is an OrderOptions or a sequence of (S, K, P, LorS, option_type) tuples
+        columns = [[], [], [], [], []]
+        counts = []
+        for strategy in strategies:
+            if hasattr(strategy, 'legs'):
+                legs = strategy.legs
+                for column, values in zip(columns, (legs.S, legs.K, legs.P, legs.is_long, legs.is_call)):
+                    column.append(values)
+                counts.append(len(legs))
+            else:
+                strategy = list(strategy)
+                if strategy:
+                    for column, values in zip(columns, zip(*strategy)):
+                        column.append(np.asarray(values))
+                counts.append(len(strategy))
+        offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        if offsets[-1] == 0:
+            return cls(offsets, [], [], [], np.zeros(0, dtype=bool), np.zeros(0, dtype=bool))
+        S, K, P, LorS, option_type = [np.concatenate(column) for column in columns]
+        return cls(offsets, S, K, P, LorS, option_type)
+
+    @classmethod
+    def from_padded(cls, S, K, P, LorS, option_type, mask=None):
+        # Padded N x max_legs leg tensor; mask marks the slots that hold a leg
+        K = np.asarray(K, dtype=float)
+        if mask is None:
+            mask = np.ones(K.shape, dtype=bool)
+        mask = np.asarray(mask, dtype=bool)
+        offsets = np.concatenate(([0], np.cumsum(mask.sum(axis=1), dtype=np.int64)))
+        columns = [np.broadcast_to(np.asarray(values), K.shape)[mask] for values in (S, K, P, LorS, option_type)]
+        return cls(offsets, *columns)
+
+    def __len__(self):
+        return self.leg_counts.size
+
+    def calculate_price(self):
+        # Net premium (intrinsic minus premium at the current price) per strategy
+        prices = payoff_kernel(self.S, self.K, self.P, self.is_long, self.is_call)
+        return np.bincount(self.strategy_index, weights=prices, minlength=len(self))
+
+    def _chunk_stops(self, n_points, max_bytes):
+        # Split strategies so that one chunk's legs x grid block stays under max_bytes
+        leg_budget = max(int(max_bytes // (8 * max(n_points, 1))), 1)
+        start = 0
+        while start < len(self):
+            stop = int(np.searchsorted(self.offsets, self.offsets[start] + leg_budget, side='right')) - 1
+            stop = min(max(stop, start + 1), len(self))
+            yield start, stop
+            start = stop
+
+    def _left_line(self):
+        # Line left of every strike per strategy: puts are in the money, calls worthless
+        sign = np.where(self.is_long, 1.0, -1.0)
+        slope0 = np.bincount(self.strategy_index, weights=np.where(self.is_call, 0.0, -sign), minlength=len(self))
+        intercept0 = np.bincount(self.strategy_index,
+                                 weights=np.where(self.is_call, -sign * self.P, sign * (self.K - self.P)),
+                                 minlength=len(self))
+        return sign, slope0, intercept0
+
+    def iter_payoff_chunks(self, underlying_range, max_bytes=64 * 2**20):
+        # underlying_range is one shared grid or an N x G grid per strategy.
+        # By put-call parity every strategy is its left line plus sum(sign * max(x - K, 0)),
+        # so each leg costs one subtract, one maximum and one multiply per grid point.
+        underlying_range = np.asarray(underlying_range, dtype=float)
+        n_points = underlying_range.shape[-1]
+        sign, slope0, intercept0 = self._left_line()
+        for start, stop in self._chunk_stops(n_points, max_bytes):
+            lo, hi = self.offsets[start], self.offsets[stop]
+            if underlying_range.ndim == 2:
+                grid = underlying_range[start:stop]
+                leg_payoffs = underlying_range[self.strategy_index[lo:hi]]
+                leg_payoffs -= self.K[lo:hi, None]
+            else:
+                grid = underlying_range[None, :]
+                leg_payoffs = grid - self.K[lo:hi, None]
+            np.maximum(leg_payoffs, 0, out=leg_payoffs)
+            leg_payoffs *= sign[lo:hi, None]
+            block = slope0[start:stop, None] * grid + intercept0[start:stop, None]
+            # Add the k-th leg of every strategy at once; loops only over the leg count
+            counts = self.leg_counts[start:stop]
+            starts = self.offsets[start:stop] - lo
+            for k in range(int(counts.max(initial=0))):
+                rows = counts > k
+                if rows.all():
+                    block += leg_payoffs[starts + k]
+                else:
+                    block[rows] += leg_payoffs[starts[rows] + k]
+            yield start, stop, block
+
+    def payoff_matrix(self, underlying_range, out=None, max_bytes=64 * 2**20):
+        # out may be a preallocated (or memory-mapped) N x G array
+        n_points = np.shape(underlying_range)[-1]
+        if out is None:
+            out = np.empty((len(self), n_points))
+        for start, stop, block in self.iter_payoff_chunks(underlying_range, max_bytes):
+            out[start:stop] = block
+        return out
+
+    def segments(self):
+        # Piecewise-linear expiry payoff of every strategy, computed once:
+        # one left segment per strategy plus one segment right of each sorted strike
+        if self._segments is not None:
+            return self._segments
+        n = len(self)
+        sign, slope0, intercept0 = self._left_line()
+
+        order = np.lexsort((self.K, self.strategy_index))
+        strike = self.K[order]
+        strategy = self.strategy_index[order]
+        d_slope = np.cumsum(sign[order])
+        d_intercept = np.cumsum(-sign[order] * strike)
+        first = self.offsets[:-1]
+        slope = slope0[strategy] + d_slope - np.concatenate(([0.0], d_slope))[first][strategy]
+        intercept = intercept0[strategy] + d_intercept - np.concatenate(([0.0], d_intercept))[first][strategy]
+
+        is_last = np.ones(strike.size, dtype=bool)
+        is_last[:-1] = strategy[1:] != strategy[:-1]
+        upper = np.full(strike.size, np.inf)
+        upper[:-1] = np.where(is_last[:-1], np.inf, strike[1:])
+        first_strike = np.full(n, np.inf)
+        filled = self.leg_counts > 0
+        first_strike[filled] = strike[first[filled]]
+
+        self._segments = {
+            'strategy': np.concatenate((np.arange(n), strategy)),
+            'slope': np.concatenate((slope0, slope)),
+            'intercept': np.concatenate((intercept0, intercept)),
+            'lower': np.concatenate((np.zeros(n), strike)),
+            'upper': np.concatenate((first_strike, upper)),
+        }
+        return self._segments
+
+    def breakevens(self):
+        # Exact breakevens of all strategies as a CSR pair (values, offsets)
+        seg = self.segments()
+        roots, inside = segment_roots(seg['slope'], seg['intercept'], seg['lower'], seg['upper'])
+        strategy = seg['strategy'][inside]
+        roots = roots[inside]
+        order = np.lexsort((roots, strategy))
+        strategy = strategy[order]
+        roots = roots[order]
+        keep = np.ones(roots.size, dtype=bool)
+        keep[1:] = (strategy[1:] != strategy[:-1]) | (roots[1:] != roots[:-1])
+        strategy = strategy[keep]
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(strategy, minlength=len(self)))))
+        return roots[keep], offsets
+
+    def breakeven_points(self):
+        values, offsets = self.breakevens()
+        return np.split(values, offsets[1:-1])
+
+    def _knot_values(self):
+        seg = self.segments()
+        return seg['strategy'], seg['slope'] * seg['lower'] + seg['intercept']
+
+    def _last_slope(self):
+        # Slope right of each strategy's highest strike decides unbounded profit or loss
+        seg = self.segments()
+        n = len(self)
+        slope = seg['slope'][:n].copy()
+        filled = self.leg_counts > 0
+        slope[filled] = seg['slope'][n + self.offsets[1:][filled] - 1]
+        return slope
+
+    def max_profit(self):
+        strategy, values = self._knot_values()
+        result = np.full(len(self), -np.inf)
+        np.maximum.at(result, strategy, values)
+        result[self._last_slope() > 0] = np.inf
+        return result
+
+    def max_loss(self):
+        strategy, values = self._knot_values()
+        result = np.full(len(self), np.inf)
+        np.minimum.at(result, strategy, values)
+        result[self._last_slope() < 0] = -np.inf
+        return result
@@ -0,0 +1,152 @@
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import numpy as np
+import matplotlib
+from rendering import set_headless, render_batch
+from plain_vanilla_options import PlainVanillaOptions
+from order_options import OrderOptions
+from call_spread import CallSpread
+from debit_spread import DebitSpread
+from breakthrough import Breakthrough
+from consolidation import Consolidation
+from batch_strategies import BatchStrategies
+from payoff_cache import PayoffCache
+
+STRATEGY_CLASSES = (CallSpread, DebitSpread, Breakthrough, Consolidation)
+
+def random_legs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (4000.0, rng.uniform(3000, 5000, n).round(), rng.uniform(10, 200, n).round(1),
+            rng.choice(['long', 'short'], n), rng.choice(['call', 'put'], n))
+
+def random_strategies(n, seed=0):
+    # Two-leg (option1, option2) tuples around a 4000 spot
+    rng = np.random.default_rng(seed)
+    strikes = rng.uniform(3500, 4500, (n, 2)).round()
+    premiums = rng.uniform(10, 200, (n, 2)).round(1)
+    directions = rng.choice(['long', 'short'], (n, 2))
+    types = rng.choice(['call', 'put'], (n, 2))
+    return [tuple((4000, strikes[i, j], premiums[i, j], directions[i, j], types[i, j]) for j in range(2))
+            for i in range(n)]
+
+def time_case(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times), float(np.median(times))
+
+def cases(legs, grids, strategies, figures):
+    # Yields (name, params, fn); setup happens here so only fn is timed
+    option = PlainVanillaOptions(4000, 4100, 90, 'long', 'call')
+    option.calculate_price()
+    yield 'plain_price', {}, option.calculate_price
+    for n_grid in grids:
+        underlying_range = np.linspace(2400, 5300, n_grid)
+        yield 'plain_payoff', {'grid': n_grid}, lambda: option.calculate_payoff(underlying_range)
+
+    for n_legs in legs:
+        columns = random_legs(n_legs)
+        options = [PlainVanillaOptions(*leg) for leg in zip(*np.broadcast_arrays(*columns))]
+        yield 'plain_price_loop', {'legs': n_legs}, lambda: [o.calculate_price() for o in options]
+        order_options = OrderOptions.from_arrays(*columns)
+        yield 'order_prices', {'legs': n_legs}, order_options.calculate_prices
+        yield 'order_total', {'legs': n_legs}, order_options.total_prices
+        for n_grid in grids:
+            def curve(columns=columns, n_grid=n_grid):
+                # A fresh cache so the curve is evaluated, not looked up
+                order_options = OrderOptions.from_arrays(*columns)
+                order_options.cache = PayoffCache()
+                order_options.grid = (2400, 6500, n_grid)
+                return order_options.curve_data()
+            yield 'order_curve', {'legs': n_legs, 'grid': n_grid}, curve
+
+    for n_strategies in strategies:
+        pairs = random_strategies(n_strategies)
+        for cls in STRATEGY_CLASSES:
+            # Strategies cache their derived curve, so each run builds fresh ones, as order_curve does
+            yield 'strategy_curve', {'class': cls.__name__, 'strategies': n_strategies}, \
+                lambda cls=cls, pairs=pairs: [cls(*pair).curve_data() for pair in pairs]
+        batch = BatchStrategies.from_strategies(pairs)
+        underlying_range = np.linspace(2100, 5850, 500)
+        yield 'batch_curve', {'strategies': n_strategies}, \
+            lambda batch=batch: (batch.payoff_matrix(underlying_range), batch.breakeven_points())
+
+    for n_figures in figures:
+        pairs = random_strategies(n_figures)
+
+        def build(pairs=pairs):
+            return [STRATEGY_CLASSES[i % 4](*pair) for i, pair in enumerate(pairs)]
+        yield 'plot', {'figures': n_figures}, lambda build=build: [o.plot(fname=io.BytesIO()) for o in build()]
+        yield 'render_batch', {'figures': n_figures}, \
+            lambda build=build: render_batch([(o, None) for o in build()])
+
+def run(legs, grids, strategies, figures, repeat=5, only=None):
+    results = []
+    for name, params, fn in cases(legs, grids, strategies, figures):
+        if only and name not in only:
+            continue
+        best, median = time_case(fn, repeat)
+        results.append({'name': name, 'params': params, 'min': best, 'median': median, 'repeat': repeat})
+        print(f"{name:18s} {json.dumps(params):45s} min {best * 1e3:10.3f} ms  median {median * 1e3:10.3f} ms")
+    return {
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                        'matplotlib': matplotlib.__version__, 'machine': platform.machine()},
+        'results': results,
+    }
+
+def _key(result):
+    return result['name'], json.dumps(result['params'], sort_keys=True)
+
+def compare(report, baseline, threshold=0.2):
+    # Ratio of best times against the baseline; beyond +/- threshold counts as a change
+    base = {_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        previous = base.get(_key(result))
+        if previous is None:
+            continue
+        ratio = result['min'] / previous['min'] if previous['min'] > 0 else float('inf')
+        result['baseline'] = previous['min']
+        result['ratio'] = ratio
+        if ratio > 1 + threshold:
+            result['status'] = 'regression'
+            regressions.append(result)
+        elif ratio < 1 - threshold:
+            result['status'] = 'faster'
+        else:
+            result['status'] = 'unchanged'
+        print(f"{result['status']:10s} {result['name']:18s} {json.dumps(result['params']):45s} x{ratio:.2f}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark payoff, pricing, curve and rendering paths.')
+    parser.add_argument('--legs', type=int, nargs='+', default=[1, 100, 10000, 100000])
+    parser.add_argument('--grid', type=int, nargs='+', default=[100, 10000, 1000000])
+    parser.add_argument('--strategies', type=int, nargs='+', default=[10, 1000])
+    parser.add_argument('--figures', type=int, nargs='+', default=[10])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', help='run only the named cases')
+    parser.add_argument('--output', metavar='FILE', help='write results as JSON to FILE')
+    parser.add_argument('--baseline', metavar='FILE', help='compare against a previous JSON result')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown flagged as regression')
+    args = parser.parse_args(argv)
+
+    set_headless()
+    report = run(args.legs, args.grid, args.strategies, args.figures, args.repeat, args.only)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import numpy as np
+from scipy.special import ndtr
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+class BlackScholes():
+    # Vectorized Black-Scholes values and Greeks. K, T (years), sigma, r and is_call are
+    # leg arrays that broadcast against the spot array passed to each method, e.g.
+    # K[:, None] against S[None, :] gives a legs x grid result with no Python loop.
+    def __init__(self, K, T, sigma, r=0.0, is_call=True, share_terms=True):
+        self.K = np.asarray(K, dtype=float)
+        self.is_call = np.asarray(is_call, dtype=bool)
+        T, sigma, r = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(sigma, dtype=float),
+                                          np.asarray(r, dtype=float))
+        if np.any(T < 0) or np.any(sigma < 0):
+            raise ValueError("Time to expiry and volatility must be non-negative.")
+
+        # Terms shared by legs with the same expiry, vol and rate are computed once per group.
+        # Callers whose legs all differ (e.g. an implied-vol solve) skip the grouping sort.
+        if share_terms:
+            groups, inverse = np.unique(np.stack((T.ravel(), sigma.ravel(), r.ravel()), axis=1),
+                                        axis=0, return_inverse=True)
+            inverse = inverse.reshape(T.shape)
+            group_T, group_sigma, group_r = groups.T
+        else:
+            group_T, group_sigma, group_r = T, sigma, r
+            inverse = Ellipsis
+        sqrt_T = np.sqrt(group_T)
+        self.T = group_T[inverse]
+        self.sigma = group_sigma[inverse]
+        self.r = group_r[inverse]
+        self.sqrt_T = sqrt_T[inverse]
+        self.vol_sqrt_T = (group_sigma * sqrt_T)[inverse]
+        self.drift = ((group_r + 0.5 * group_sigma ** 2) * group_T)[inverse]
+        self.discount = np.exp(-group_r * group_T)[inverse]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.theta_decay = np.where(group_T > 0, group_sigma / (2 * sqrt_T), 0.0)[inverse]
+        self.n_groups = group_T.size
+
+    def _d1_d2(self, S):
+        S = np.asarray(S, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_moneyness = np.log(S / self.K)
+            d1 = np.where(self.vol_sqrt_T > 0, (log_moneyness + self.drift) / self.vol_sqrt_T,
+                          np.where(log_moneyness + self.r * self.T > 0, np.inf, -np.inf))
+        d2 = d1 - self.vol_sqrt_T
+        return S, d1, d2
+
+    def value(self, S):
+        return self._value(*self._d1_d2(S))
+
+    def delta(self, S):
+        return self._delta(*self._d1_d2(S))
+
+    def gamma(self, S):
+        return self._gamma(*self._d1_d2(S))
+
+    def vega(self, S):
+        # Per 1.00 change in volatility
+        return self._vega(*self._d1_d2(S))
+
+    def theta(self, S):
+        # Per year of calendar time
+        return self._theta(*self._d1_d2(S))
+
+    def rho(self, S):
+        # Per 1.00 change in the interest rate
+        return self._rho(*self._d1_d2(S))
+
+    def greeks(self, S):
+        # d1/d2 are computed once and shared by the value and every Greek
+        d = self._d1_d2(S)
+        return {
+            'value': self._value(*d),
+            'delta': self._delta(*d),
+            'gamma': self._gamma(*d),
+            'vega': self._vega(*d),
+            'theta': self._theta(*d),
+            'rho': self._rho(*d),
+        }
+
+    def _value(self, S, d1, d2):
+        call = S * ndtr(d1) - self.K * self.discount * ndtr(d2)
+        put = self.K * self.discount * ndtr(-d2) - S * ndtr(-d1)
+        return np.where(self.is_call, call, put)
+
+    def _delta(self, S, d1, d2):
+        return np.where(self.is_call, ndtr(d1), ndtr(d1) - 1)
+
+    def _gamma(self, S, d1, d2):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.vol_sqrt_T > 0, _norm_pdf(d1) / (S * self.vol_sqrt_T), 0.0)
+
+    def _vega(self, S, d1, d2):
+        return S * _norm_pdf(d1) * self.sqrt_T
+
+    def _theta(self, S, d1, d2):
+        decay = -S * _norm_pdf(d1) * self.theta_decay
+        carry = self.r * self.K * self.discount
+        return np.where(self.is_call, decay - carry * ndtr(d2), decay + carry * ndtr(-d2))
+
+    def _rho(self, S, d1, d2):
+        exposure = self.K * self.T * self.discount
+        return np.where(self.is_call, exposure * ndtr(d2), -exposure * ndtr(-d2))
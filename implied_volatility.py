@@ -0,0 +1,89 @@
+import numpy as np
+from black_scholes import BlackScholes
+
+# Per-element status codes returned with every solve
+CONVERGED = 0       # Newton iterations converged
+BISECTED = 1        # Newton left the bracket or stalled, bisection converged
+OUT_OF_BOUNDS = 2   # Premium outside no-arbitrage bounds (or T <= 0), no volatility exists
+FAILED = 3          # Neither method reached the tolerance
+ILL_CONDITIONED = 4 # Premium matched, but vega is too small for the price to pin sigma to vol_tol
+
+def _initial_guess(price, S, K, T, r, is_call):
+    # Corrado-Miller approximation on the call price (puts converted by parity)
+    X = K * np.exp(-r * T)
+    call = np.where(is_call, price, price + S - X)
+    half = call - (S - X) / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        root = np.sqrt(np.maximum(half ** 2 - (S - X) ** 2 / np.pi, 0.0))
+        guess = np.sqrt(2 * np.pi) / (S + X) * (half + root) / np.sqrt(T)
+    return np.where(np.isfinite(guess) & (guess > 0), guess, 0.3)
+
+def _resolvable(vega, S, K, vol_tol):
+    # A vol_tol move in sigma must change the price by more than its rounding noise
+    noise = 16 * np.finfo(float).eps * np.maximum(S, K)
+    return vega * vol_tol > noise
+
+def implied_volatility(price, S, K, T, r=0.0, is_call=True, tol=1e-8, max_iter=50, bisect_iter=200,
+                       lower=1e-6, upper=5.0, vol_tol=1e-6):
+    # Vectorized solve over whole chains: returns (sigma, status) in the broadcast shape.
+    # tol bounds the price residual and vol_tol the error in sigma; ILL_CONDITIONED elements
+    # carry a sigma that reproduces the premium but may be off by more than vol_tol.
+    price, S, K, T, r, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype=float), np.asarray(S, dtype=float), np.asarray(K, dtype=float),
+        np.asarray(T, dtype=float), np.asarray(r, dtype=float), np.asarray(is_call, dtype=bool))
+    shape = price.shape
+    price, S, K, T, r, is_call = [a.ravel() for a in (price, S, K, T, r, is_call)]
+
+    sigma = np.full(price.size, np.nan)
+    status = np.full(price.size, FAILED, dtype=np.int8)
+
+    discount = np.exp(-r * np.maximum(T, 0.0))
+    floor = np.where(is_call, np.maximum(S - K * discount, 0.0), np.maximum(K * discount - S, 0.0))
+    cap = np.where(is_call, S, K * discount)
+    valid = (T > 0) & (price > floor) & (price < cap)
+    status[~valid] = OUT_OF_BOUNDS
+
+    # Newton on the elements still active; converged ones are masked out each round
+    active = np.flatnonzero(valid)
+    guess = np.clip(_initial_guess(price[active], S[active], K[active], T[active], r[active], is_call[active]),
+                    lower, upper)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        engine = BlackScholes(K[active], T[active], guess, r[active], is_call[active], share_terms=False)
+        diff = engine.value(S[active]) - price[active]
+        vega = engine.vega(S[active])
+        matched = np.abs(diff) < tol
+        resolvable = _resolvable(vega, S[active], K[active], vol_tol)
+        # Converged only once the Newton step in sigma is below vol_tol as well
+        done = matched & ((np.abs(diff) < vega * vol_tol) | ~resolvable)
+        sigma[active[done]] = guess[done]
+        status[active[done]] = np.where(resolvable[done], CONVERGED, ILL_CONDITIONED)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = guess - diff / vega
+        keep = ~done & np.isfinite(step) & (step > lower) & (step < upper)
+        active = active[keep]
+        guess = step[keep]
+
+    # Bisection fallback for everything Newton did not settle
+    pending = np.flatnonzero(valid & (status == FAILED))
+    if pending.size:
+        low = np.full(pending.size, lower)
+        high = np.full(pending.size, upper)
+        for _ in range(bisect_iter):
+            mid = 0.5 * (low + high)
+            engine = BlackScholes(K[pending], T[pending], mid, r[pending], is_call[pending], share_terms=False)
+            above = engine.value(S[pending]) > price[pending]
+            high = np.where(above, mid, high)
+            low = np.where(above, low, mid)
+            if np.all(high - low < tol):
+                break
+        mid = 0.5 * (low + high)
+        engine = BlackScholes(K[pending], T[pending], mid, r[pending], is_call[pending], share_terms=False)
+        done = np.abs(engine.value(S[pending]) - price[pending]) < np.sqrt(tol)
+        resolvable = _resolvable(engine.vega(S[pending]), S[pending], K[pending], vol_tol)
+        sigma[pending[done]] = mid[done]
+        status[pending[done]] = np.where(resolvable[done], BISECTED, ILL_CONDITIONED)
+
+    return sigma.reshape(shape), status.reshape(shape)
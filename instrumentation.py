@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+# Opt-in timing spans and counters. While disabled, span() hands back one shared no-op
+# context manager and count() returns immediately, so instrumented code pays a call only.
+# Per-span events for trace export are kept in a ring of the most recent max_events, so a
+# long-running process stays flat; the summary totals cover every span regardless.
+_enabled = False
+_lock = threading.Lock()
+_events = deque(maxlen=100000)
+_totals = defaultdict(lambda: [0, 0, 0])  # name -> [calls, total ns, max ns]
+_counters = defaultdict(int)
+
+def enable(enabled=True, max_events=None):
+    # max_events resizes the trace ring, keeping its newest events; 0 records no trace events
+    global _enabled, _events
+    if max_events is not None:
+        with _lock:
+            _events = deque(_events, maxlen=max_events)
+    _enabled = enabled
+
+def disable():
+    enable(False)
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _events.clear()
+        _totals.clear()
+        _counters.clear()
+
+class _NullSpan():
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span():
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        with _lock:
+            _events.append((self.name, self.start, duration, threading.get_ident()))
+            total = _totals[self.name]
+            total[0] += 1
+            total[1] += duration
+            total[2] = max(total[2], duration)
+        return False
+
+def span(name):
+    return _Span(name) if _enabled else _NULL_SPAN
+
+def count(name, n=1):
+    if _enabled:
+        _counters[name] += n
+
+def counters():
+    return dict(_counters)
+
+def summary():
+    # One row per span name, slowest total first
+    rows = [{'span': name, 'calls': calls, 'total_ms': total / 1e6, 'mean_ms': total / calls / 1e6,
+             'max_ms': longest / 1e6} for name, (calls, total, longest) in _totals.items()]
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+def format_summary():
+    lines = [f"{'span':32s} {'calls':>8s} {'total ms':>12s} {'mean ms':>10s} {'max ms':>10s}"]
+    for row in summary():
+        lines.append(f"{row['span']:32s} {row['calls']:8d} {row['total_ms']:12.3f} {row['mean_ms']:10.3f} "
+                     f"{row['max_ms']:10.3f}")
+    for name, value in sorted(_counters.items()):
+        lines.append(f"{name:32s} {value:8d}")
+    return '\n'.join(lines)
+
+def trace_events():
+    # Chrome trace format ("X" complete events, microseconds), readable by Perfetto and speedscope
+    pid = os.getpid()
+    with _lock:
+        recorded = list(_events)
+    events = [{'name': name, 'ph': 'X', 'ts': start / 1e3, 'dur': duration / 1e3, 'pid': pid, 'tid': tid}
+              for name, start, duration, tid in recorded]
+    if recorded:
+        end = max(start + duration for name, start, duration, tid in recorded) / 1e3
+        events.extend({'name': name, 'ph': 'C', 'ts': end, 'pid': pid, 'args': {name: value}}
+                      for name, value in _counters.items())
+    return events
+
+def write_trace(path):
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': trace_events(), 'displayTimeUnit': 'ms'}, f)
+    return path
@@ -0,0 +1,219 @@
+import numpy as np
+from plain_vanilla_options import PlainVanillaOptions
+from piecewise_payoff import PiecewiseLinearPayoff
+from black_scholes import BlackScholes
+from implied_volatility import implied_volatility
+
+def encode_direction(LorS):
+    # 'long'/'short' strings (or booleans) to a boolean is_long column
+    LorS = np.asarray(LorS)
+    if LorS.dtype == bool:
+        return LorS
+    is_long = LorS == 'long'
+    if not np.all(is_long | (LorS == 'short')):
+        raise ValueError("Invalid option direction. Please specify 'long' or 'short'.")
+    return is_long
+
+def encode_option_type(option_type):
+    # 'call'/'put' strings (or booleans) to a boolean is_call column
+    option_type = np.asarray(option_type)
+    if option_type.dtype == bool:
+        return option_type
+    is_call = option_type == 'call'
+    if not np.all(is_call | (option_type == 'put')):
+        raise ValueError("Invalid option type. Please specify 'call' or 'put'.")
+    return is_call
+
+def payoff_kernel(underlying_price, K, P, is_long, is_call):
+    # Broadcasting expiry payoff: leg columns against any shape of underlying prices
+    intrinsic = np.where(is_call, np.maximum(0, underlying_price - K), np.maximum(0, K - underlying_price))
+    return np.where(is_long, intrinsic - P, P - intrinsic)
+
+class LegStore():
+    # Struct-of-arrays storage: one float column per S/K/P and one boolean column
+    # per direction/type, grown geometrically so appends are amortized O(1)
+    def __init__(self, capacity=16):
+        capacity = max(int(capacity), 1)
+        self._S = np.empty(capacity)
+        self._K = np.empty(capacity)
+        self._P = np.empty(capacity)
+        self._is_long = np.empty(capacity, dtype=bool)
+        self._is_call = np.empty(capacity, dtype=bool)
+        self._size = 0
+        # Columns still shared with the caller of from_columns; copied before the first write
+        self._borrowed = set()
+        # Bumped on every mutation so cached curves can tell they are stale
+        self.version = 0
+
+    @classmethod
+    def from_arrays(cls, S, K, P, LorS, option_type):
+        legs = cls(capacity=np.size(K))
+        legs.extend(S, K, P, LorS, option_type)
+        return legs
+
+    @classmethod
+    def from_columns(cls, S, K, P, is_long, is_call):
+        # Wraps existing columns (e.g. memory-mapped fields) without copying them;
+        # the first append, remove, update or set_spot moves the store onto its own arrays
+        legs = cls(capacity=1)
+        legs._S, legs._K, legs._P, legs._is_long, legs._is_call = S, K, P, is_long, is_call
+        legs._size = len(K)
+        legs._borrowed = {'_S', '_K', '_P', '_is_long', '_is_call'}
+        return legs
+
+    def __len__(self):
+        return self._size
+
+    def _column(self, column):
+        # Read-only view: edits must go through extend/remove/update/set_spot so that
+        # version tracks every change to K, P or the leg flags
+        view = column[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def S(self):
+        return self._column(self._S)
+
+    @property
+    def K(self):
+        return self._column(self._K)
+
+    @property
+    def P(self):
+        return self._column(self._P)
+
+    @property
+    def is_long(self):
+        return self._column(self._is_long)
+
+    @property
+    def is_call(self):
+        return self._column(self._is_call)
+
+    def _reserve(self, size):
+        if size <= self._S.size:
+            return
+        capacity = max(size, 2 * self._S.size)
+        for name in ('_S', '_K', '_P', '_is_long', '_is_call'):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+        self._borrowed.clear()
+
+    def append(self, S, K, P, LorS, option_type):
+        self.extend([S], [K], [P], [LorS], [option_type])
+
+    def extend(self, S, K, P, LorS, option_type):
+        K = np.asarray(K, dtype=float).ravel()
+        n = K.size
+        is_long = np.broadcast_to(encode_direction(LorS), n)
+        is_call = np.broadcast_to(encode_option_type(option_type), n)
+        start = self._size
+        self._reserve(start + n)
+        stop = start + n
+        self._S[start:stop] = S
+        self._K[start:stop] = K
+        self._P[start:stop] = P
+        self._is_long[start:stop] = is_long
+        self._is_call[start:stop] = is_call
+        self._size = stop
+        self.version += 1
+
+    def remove(self, index):
+        # Accepts a single position or an array of positions
+        keep = np.ones(self._size, dtype=bool)
+        keep[index] = False
+        for name in ('_S', '_K', '_P', '_is_long', '_is_call'):
+            setattr(self, name, getattr(self, name)[:self._size][keep])
+        self._borrowed.clear()
+        self._size = int(np.count_nonzero(keep))
+        self.version += 1
+
+    def _own(self, name):
+        # Column safe to write in place: borrowed or read-only columns are copied first
+        column = getattr(self, name)
+        if name in self._borrowed or not column.flags.writeable:
+            column = np.array(column)
+            setattr(self, name, column)
+            self._borrowed.discard(name)
+        return column
+
+    def update(self, index, K=None, P=None):
+        # Changes the strike and/or premium of one leg in place
+        for name, value in (('_K', K), ('_P', P)):
+            if value is not None:
+                self._own(name)[:self._size][index] = value
+        self.version += 1
+
+    def set_spot(self, S):
+        # Spot only moves prices, not expiry payoffs, so the version is left alone
+        self._own('_S')[:self._size] = S
+
+    def option(self, index):
+        return PlainVanillaOptions(float(self.S[index]), float(self.K[index]), float(self.P[index]),
+                                   'long' if self.is_long[index] else 'short',
+                                   'call' if self.is_call[index] else 'put')
+
+    def calculate_prices(self):
+        return payoff_kernel(self.S, self.K, self.P, self.is_long, self.is_call)
+
+    def total_prices(self):
+        return float(np.sum(self.calculate_prices()))
+
+    def leg_payoffs(self, underlying_range):
+        # Legs x grid matrix of individual payoff curves
+        underlying_range = np.asarray(underlying_range, dtype=float)
+        return payoff_kernel(underlying_range[None, :], self.K[:, None], self.P[:, None],
+                             self.is_long[:, None], self.is_call[:, None])
+
+    def payoff_model(self):
+        return PiecewiseLinearPayoff(self.K, self.P, self.is_long, self.is_call)
+
+    def calculate_payoff(self, underlying_price):
+        # Total payoff; the piecewise model avoids materializing a legs x grid matrix
+        return self.payoff_model().evaluate(underlying_price)
+
+    def _model_inputs(self, T, sigma, r, elapsed):
+        n = len(self)
+        T = np.broadcast_to(np.maximum(np.asarray(T, dtype=float) - elapsed, 0.0), n)
+        sigma = np.broadcast_to(np.asarray(sigma, dtype=float), n)
+        missing = np.flatnonzero(~np.isfinite(sigma))
+        if missing.size:
+            # One NaN leg would turn the whole position curve into NaN
+            raise ValueError(f"Volatility is not finite for legs {missing.tolist()}; pass fallback= to "
+                             "implied_volatility() for legs whose premium has no implied volatility.")
+        return T, sigma, np.broadcast_to(np.asarray(r, dtype=float), n)
+
+    def model_pnl(self, underlying_range, T, sigma, r=0.0, elapsed=0.0, max_bytes=64 * 2**20):
+        # Black-Scholes P&L curve of the whole position, `elapsed` years from today.
+        # elapsed=0 gives the T+0 curve; elapsed >= T gives the expiry payoff.
+        underlying_range = np.asarray(underlying_range, dtype=float)
+        T, sigma, r = self._model_inputs(T, sigma, r, elapsed)
+        sign = np.where(self.is_long, 1.0, -1.0)
+        total = np.zeros(underlying_range.size)
+        chunk = max(int(max_bytes // (8 * max(underlying_range.size, 1))), 1)
+        for lo in range(0, len(self), chunk):
+            hi = lo + chunk
+            engine = BlackScholes(self.K[lo:hi, None], T[lo:hi, None], sigma[lo:hi, None], r[lo:hi, None],
+                                  self.is_call[lo:hi, None])
+            values = engine.value(underlying_range.ravel()[None, :]) - self.P[lo:hi, None]
+            total += sign[lo:hi] @ values
+        return total.reshape(underlying_range.shape)
+
+    def model_greeks(self, T, sigma, r=0.0, elapsed=0.0):
+        # Position value and Greeks at each leg's own spot, signed by direction
+        T, sigma, r = self._model_inputs(T, sigma, r, elapsed)
+        sign = np.where(self.is_long, 1.0, -1.0)
+        greeks = BlackScholes(self.K, T, sigma, r, self.is_call).greeks(self.S)
+        return {name: float(sign @ values) for name, values in greeks.items()}
+
+    def implied_volatility(self, T, r=0.0, fallback=None):
+        # Implied vol of every leg from its premium P, as (sigma, status). Legs whose premium
+        # is outside the no-arbitrage bounds, or whose solve failed, get NaN, or `fallback`
+        # when given; with a fallback the sigma column can go straight to model_pnl / model_greeks.
+        sigma, status = implied_volatility(self.P, self.S, self.K, T, r, self.is_call)
+        if fallback is not None:
+            sigma = np.where(np.isfinite(sigma), sigma, fallback)
+        return sigma, status
@@ -0,0 +1,182 @@
+import asyncio
+import time
+
+class ReplaySource():
+    # Async tick source over a "symbol,spot" (or "timestamp,symbol,spot") text file.
+    # With speed set, ticks are replayed at their recorded pace divided by speed.
+    def __init__(self, path, speed=None):
+        self.path = path
+        self.speed = speed
+
+    async def __aiter__(self):
+        first = None
+        clock = None
+        with open(self.path) as f:
+            for line in f:
+                fields = [field.strip() for field in line.split(',')]
+                if len(fields) < 2 or fields[-1] in ('', 'spot'):
+                    continue
+                if len(fields) == 3 and self.speed:
+                    timestamp = float(fields[0])
+                    if first is None:
+                        first, clock = timestamp, time.monotonic()
+                    wait = clock + (timestamp - first) / self.speed - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                yield fields[-2], float(fields[-1])
+
+class SocketSource():
+    # Async tick source reading "symbol,spot" lines from a local TCP socket
+    def __init__(self, host='127.0.0.1', port=9000):
+        self.host = host
+        self.port = port
+
+    async def __aiter__(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                fields = line.decode().strip().split(',')
+                if len(fields) >= 2:
+                    yield fields[-2], float(fields[-1])
+        finally:
+            writer.close()
+
+class RepricerMetrics():
+    def __init__(self):
+        self.ticks_received = 0
+        self.ticks_coalesced = 0
+        self.legs_repriced = 0
+        self.updates_published = 0
+        self.queue_high_water = 0
+        self.producer_wait = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def latency_mean(self):
+        if self.updates_published == 0:
+            return 0.0
+        return self.latency_total / self.updates_published
+
+    def summary(self):
+        return {
+            'ticks_received': self.ticks_received,
+            'ticks_coalesced': self.ticks_coalesced,
+            'legs_repriced': self.legs_repriced,
+            'updates_published': self.updates_published,
+            'queue_high_water': self.queue_high_water,
+            'producer_wait': self.producer_wait,
+            'latency_mean': self.latency_mean(),
+            'latency_max': self.latency_max,
+        }
+
+class LiveRepricer():
+    # Consumes spot ticks per underlying, reprices only the book of each ticked symbol
+    # and publishes updated total_prices(). Ticks queued while a reprice runs are
+    # coalesced to the latest spot per symbol. A bounded queue pushes back on the feed;
+    # producer_wait and queue_high_water in metrics show when the repricer falls behind.
+    def __init__(self, books, max_queue=10000, on_update=None):
+        self.books = books
+        self.max_queue = max_queue
+        self.on_update = on_update
+        self.totals = {symbol: book.total_prices() for symbol, book in books.items()}
+        self.total = sum(self.totals.values())
+        self.metrics = RepricerMetrics()
+        self.queue = None
+
+    def backlog(self):
+        # Ticks waiting in the queue; a backlog that keeps growing means the repricer lags the feed
+        return 0 if self.queue is None else self.queue.qsize()
+
+    async def run(self, source):
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        consumer = asyncio.create_task(self._consume())
+        try:
+            await self._feed(source)
+            await self.queue.put(None)
+            await consumer
+        finally:
+            consumer.cancel()
+
+    async def _feed(self, source):
+        loop = asyncio.get_running_loop()
+        async for symbol, spot in source:
+            self.metrics.ticks_received += 1
+            if self.queue.full():
+                blocked = loop.time()
+                await self.queue.put((symbol, spot, loop.time()))
+                self.metrics.producer_wait += loop.time() - blocked
+            else:
+                self.queue.put_nowait((symbol, spot, loop.time()))
+            self.metrics.queue_high_water = max(self.metrics.queue_high_water, self.queue.qsize())
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            tick = await self.queue.get()
+            done = tick is None
+            latest = {}
+            oldest = None
+            # Drain the burst that built up and keep only the last spot per symbol
+            while tick is not None:
+                symbol, spot, received = tick
+                if symbol in latest:
+                    self.metrics.ticks_coalesced += 1
+                latest[symbol] = spot
+                oldest = received if oldest is None else min(oldest, received)
+                if self.queue.empty():
+                    break
+                tick = self.queue.get_nowait()
+                done = done or tick is None
+            if latest:
+                await self._reprice(latest, loop.time() - oldest)
+            if done:
+                return
+            # Let the feed run between bursts
+            await asyncio.sleep(0)
+
+    async def _reprice(self, latest, waited):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        changed = {}
+        for symbol, spot in latest.items():
+            book = self.books.get(symbol)
+            if book is None:
+                continue
+            book.set_spot(spot)
+            total = book.total_prices()
+            self.total += total - self.totals[symbol]
+            self.totals[symbol] = total
+            changed[symbol] = total
+            self.metrics.legs_repriced += len(book.legs)
+        latency = waited + loop.time() - started
+        self.metrics.updates_published += 1
+        self.metrics.latency_total += latency
+        self.metrics.latency_max = max(self.metrics.latency_max, latency)
+        if self.on_update is not None:
+            update = self.on_update({'total': self.total, 'changed': changed})
+            if asyncio.iscoroutine(update):
+                await update
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    import numpy as np
+    from order_options import OrderOptions
+
+    rng = np.random.default_rng(0)
+    books = {}
+    for symbol in ('TXO', 'SPX', 'NDX'):
+        n = 10000
+        books[symbol] = OrderOptions.from_arrays(4000, rng.uniform(3000, 5000, n), rng.uniform(10, 200, n),
+                                                 rng.choice(['long', 'short'], n), rng.choice(['call', 'put'], n))
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+        for symbol, spot in zip(rng.choice(list(books), 20000), 4000 + rng.normal(0, 20, 20000).cumsum()):
+            f.write(f"{symbol},{spot:.2f}\n")
+    repricer = LiveRepricer(books, max_queue=1000)
+    asyncio.run(repricer.run(ReplaySource(f.name)))
+    os.unlink(f.name)
+    print("Total Price:", repricer.total)
+    print(repricer.metrics.summary())
@@ -0,0 +1,185 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from piecewise_payoff import PiecewiseLinearPayoff
+
+class LognormalSampler():
+    # Terminal prices under Black-Scholes dynamics
+    def __init__(self, S0, T, sigma, r=0.0):
+        self.S0 = S0
+        self.T = T
+        self.sigma = sigma
+        self.r = r
+
+    def __call__(self, rng, n):
+        drift = (self.r - 0.5 * self.sigma ** 2) * self.T
+        return self.S0 * np.exp(drift + self.sigma * np.sqrt(self.T) * rng.standard_normal(n))
+
+class _Accumulator():
+    # Mergeable running statistics: moments (Chan et al. pairwise update), profit
+    # count and a fixed-edge histogram with per-bin sums for tail averages
+    def __init__(self, edges):
+        self.edges = edges
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.n_profit = 0
+        self.counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        self.sums = np.zeros(len(edges) - 1)
+
+    def add(self, pnl):
+        n = pnl.size
+        mean = pnl.mean()
+        m2 = np.sum((pnl - mean) ** 2)
+        self._merge_moments(n, mean, m2)
+        self.n_profit += int(np.count_nonzero(pnl > 0))
+        width = self.edges[1] - self.edges[0]
+        index = np.clip(((pnl - self.edges[0]) / width).astype(np.int64), 0, self.counts.size - 1)
+        self.counts += np.bincount(index, minlength=self.counts.size)
+        self.sums += np.bincount(index, weights=pnl, minlength=self.counts.size)
+
+    def merge(self, other):
+        self._merge_moments(other.n, other.mean, other.m2)
+        self.n_profit += other.n_profit
+        self.counts += other.counts
+        self.sums += other.sums
+
+    def _merge_moments(self, n, mean, m2):
+        total = self.n + n
+        if total == 0:
+            return
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+def _simulate(payoff_model, sampler, seed, n, edges):
+    rng = np.random.Generator(np.random.PCG64(seed))
+    accumulator = _Accumulator(edges)
+    accumulator.add(payoff_model.evaluate(sampler(rng, n)))
+    return accumulator
+
+class MonteCarloResult():
+    def __init__(self, accumulator, target_se=None):
+        self._accumulator = accumulator
+        self.n_paths = accumulator.n
+        self.expected_pnl = accumulator.mean
+        self.std = np.sqrt(accumulator.m2 / max(accumulator.n - 1, 1))
+        self.std_error = self.std / np.sqrt(max(accumulator.n, 1))
+        self.probability_of_profit = accumulator.n_profit / max(accumulator.n, 1)
+        self.converged = target_se is not None and self.std_error <= target_se
+
+    def histogram(self):
+        return self._accumulator.edges, self._accumulator.counts
+
+    def _tail(self, level):
+        # Bin holding the (1 - level) quantile; its mean stands in for the quantile, which
+        # is exact for the point masses a capped position has at max loss and max profit
+        edges, counts = self.histogram()
+        target = (1 - level) * self.n_paths
+        cumulative = np.cumsum(counts)
+        b = int(np.searchsorted(cumulative, target))
+        below = cumulative[b - 1] if b else 0
+        if not counts[b]:
+            return b, below, 0.0, edges[b]
+        return b, below, (target - below) / counts[b], self._accumulator.sums[b] / counts[b]
+
+    def var(self, level=0.95):
+        # Value at risk as a positive loss amount
+        b, below, fraction, quantile = self._tail(level)
+        return -quantile
+
+    def cvar(self, level=0.95):
+        # Expected loss in the worst (1 - level) of outcomes, as a positive amount
+        b, below, fraction, quantile = self._tail(level)
+        sums = self._accumulator.sums
+        tail_sum = sums[:b].sum() + fraction * sums[b]
+        tail_count = below + fraction * self._accumulator.counts[b]
+        return -tail_sum / tail_count if tail_count else -quantile
+
+    def summary(self, level=0.95):
+        return {
+            'n_paths': self.n_paths,
+            'expected_pnl': self.expected_pnl,
+            'std_error': self.std_error,
+            'probability_of_profit': self.probability_of_profit,
+            'var': self.var(level),
+            'cvar': self.cvar(level),
+        }
+
+class MonteCarloEngine():
+    # P&L distribution of a position at expiry. Paths run in fixed-size chunks so memory
+    # is flat for any path count; chunk k always draws from the k-th child of the seed,
+    # so results do not depend on how many worker processes share the chunks.
+    def __init__(self, position, sampler=None, S0=None, T=None, sigma=None, r=0.0, chunk_size=1000000, bins=2000):
+        if isinstance(position, PiecewiseLinearPayoff):
+            self.payoff_model = position
+        else:
+            payoff_model = position.payoff_model
+            self.payoff_model = payoff_model() if callable(payoff_model) else payoff_model
+        if sampler is None:
+            if T is None or sigma is None:
+                raise ValueError("Specify T and sigma for the lognormal model, or pass a sampler.")
+            sampler = LognormalSampler(position.legs.S[0] if S0 is None else S0, T, sigma, r)
+        self.sampler = sampler
+        self.chunk_size = chunk_size
+        self.bins = bins
+
+    def _edges(self, seed):
+        # Histogram edges from the analytic P&L bounds, or from a pilot sample when unbounded
+        low = self.payoff_model.max_loss()
+        high = self.payoff_model.max_profit()
+        if not (np.isfinite(low) and np.isfinite(high)):
+            rng = np.random.Generator(np.random.PCG64(seed.spawn(1)[0]))
+            pilot = self.payoff_model.evaluate(self.sampler(rng, 100000))
+            pilot_low, pilot_high = np.quantile(pilot, [0.0, 1.0])
+            margin = 0.5 * (pilot_high - pilot_low) + 1.0
+            low = low if np.isfinite(low) else pilot_low - margin
+            high = high if np.isfinite(high) else pilot_high + margin
+        if high <= low:
+            high = low + 1.0
+        return np.linspace(low, high, self.bins + 1)
+
+    @staticmethod
+    def _reached(accumulator, target_se):
+        return (target_se is not None and accumulator.n > 1
+                and np.sqrt(accumulator.m2 / (accumulator.n - 1) / accumulator.n) <= target_se)
+
+    def run(self, n_paths, seed=None, target_se=None, processes=None):
+        root = np.random.SeedSequence(seed)
+        edges = self._edges(root)
+        n_chunks = -(-int(n_paths) // self.chunk_size)
+        children = root.spawn(n_chunks)
+        sizes = [min(self.chunk_size, int(n_paths) - k * self.chunk_size) for k in range(n_chunks)]
+        accumulator = _Accumulator(edges)
+        step = max(processes or 1, 1)
+        pool = ProcessPoolExecutor(max_workers=processes) if step > 1 else None
+        try:
+            for start in range(0, n_chunks, step):
+                stop = min(start + step, n_chunks)
+                args = (children[start:stop], sizes[start:stop])
+                if pool is None:
+                    results = [_simulate(self.payoff_model, self.sampler, child, size, edges)
+                               for child, size in zip(*args)]
+                else:
+                    results = pool.map(_simulate, [self.payoff_model] * (stop - start),
+                                       [self.sampler] * (stop - start), *args, [edges] * (stop - start))
+                # Stop early once the standard error of the mean reaches the target. The check runs
+                # after every chunk, so the chunks kept do not depend on the worker count.
+                for result in results:
+                    accumulator.merge(result)
+                    if self._reached(accumulator, target_se):
+                        break
+                if self._reached(accumulator, target_se):
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return MonteCarloResult(accumulator, target_se)
+
+if __name__ == '__main__':
+    from order_options import OrderOptions
+    order_options = OrderOptions((4000, 3600, 150, 'long', 'put'), (4000, 3800, 120, 'long', 'call'),
+                                 (4000, 4200, 60, 'short', 'call'))
+    engine = MonteCarloEngine(order_options, T=0.25, sigma=0.2, r=0.01)
+    result = engine.run(10 ** 7, seed=42, target_se=0.5)
+    print(result.summary())
@@ -1,79 +1,213 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from plain_vanilla_options import PlainVanillaOptions
+from leg_store import LegStore, payoff_kernel
+from payoff_cache import default_cache, grid, grid_spec, leg_curve, legs_digest
+from rendering import get_axes, finish_figure, profit_mask
+from risk_surface import RiskSurface
+from instrumentation import span, count
 
 class OrderOptions():
     def __init__(self, *args, **kwargs):
-        self.options = []
-        for option_data in args:
-            self.options.append(PlainVanillaOptions(*option_data))
+        # Thin adapter: (S, K, P, LorS, option_type) tuples are bulk-loaded into columns
+        self.legs = LegStore(capacity=len(args))
+        if args:
+            S, K, P, LorS, option_type = zip(*args)
+            self.legs.extend(S, K, P, LorS, option_type)
+
+        # Memoized payoff curves; grid=(low, high, n_points) pins the grid so that
+        # add_leg/remove_leg can update the aggregate curve incrementally. cache=None means
+        # the process-wide default_cache, resolved on use so instances never hold on to it
+        self.cache = kwargs.get('cache')
+        self.grid = kwargs.get('grid')
+        self._curve = None
+        self._curve_spec = None
+        self._curve_version = None
+
+    @classmethod
+    def from_arrays(cls, S, K, P, LorS, option_type):
+        order_options = cls()
+        order_options.legs.extend(S, K, P, LorS, option_type)
+        return order_options
+
+    @classmethod
+    def from_legs(cls, legs):
+        order_options = cls()
+        order_options.legs = legs
+        return order_options
+
+    @property
+    def cache(self):
+        return default_cache if self._cache is None else self._cache
+
+    @cache.setter
+    def cache(self, cache):
+        self._cache = cache
+
+    def __getstate__(self):
+        # Pickled copies (e.g. sent to render_batch workers) carry only the legs and grid;
+        # memoized curves are rebuilt from the receiving process's default cache
+        state = self.__dict__.copy()
+        state.update(_cache=None, _curve=None, _curve_spec=None, _curve_version=None)
+        return state
+
+    @property
+    def options(self):
+        # PlainVanillaOptions views built on demand for callers that iterate legs
+        return [self.legs.option(i) for i in range(len(self.legs))]
+
+    def add_leg(self, S, K, P, LorS, option_type):
+        fresh = self._curve_is_fresh()
+        self.legs.append(S, K, P, LorS, option_type)
+        if fresh and self.grid_spec() == self._curve_spec:
+            # Add only the new leg's contribution to the aggregate curve
+            self._curve = self._curve + leg_curve(self.cache, self._curve_spec, self.legs.K[-1], self.legs.P[-1],
+                                                  self.legs.is_long[-1], self.legs.is_call[-1])
+            self._curve_version = self.legs.version
+
+    def remove_leg(self, index):
+        fresh = self._curve_is_fresh()
+        removed = np.arange(len(self.legs))[index]
+        if np.ndim(removed) == 0:
+            removed_curve = leg_curve(self.cache, self._curve_spec, self.legs.K[removed], self.legs.P[removed],
+                                      self.legs.is_long[removed], self.legs.is_call[removed]) if fresh else None
+        elif fresh:
+            removed_curve = payoff_kernel(grid(self._curve_spec)[None, :], self.legs.K[removed, None],
+                                          self.legs.P[removed, None], self.legs.is_long[removed, None],
+                                          self.legs.is_call[removed, None]).sum(axis=0)
+        self.legs.remove(index)
+        if fresh and len(self.legs) and self.grid_spec() == self._curve_spec:
+            # Subtract only the removed legs' contribution
+            self._curve = self._curve - removed_curve
+            self._curve_version = self.legs.version
+
+    def update_leg(self, index, K=None, P=None):
+        # Re-strike or re-price one leg; on a pinned grid only that leg's curve is swapped.
+        # Leg curves are computed directly rather than cached since edits are often one-off.
+        fresh = self._curve_is_fresh() and self.grid_spec() == self._curve_spec
+        if fresh:
+            x = grid(self._curve_spec)
+            old_curve = payoff_kernel(x, self.legs.K[index], self.legs.P[index], self.legs.is_long[index],
+                                      self.legs.is_call[index])
+        self.legs.update(index, K, P)
+        if fresh and self.grid_spec() == self._curve_spec:
+            self._curve = self._curve + (payoff_kernel(x, self.legs.K[index], self.legs.P[index],
+                                                       self.legs.is_long[index], self.legs.is_call[index]) - old_curve)
+            self._curve_version = self.legs.version
+
+    def grid_spec(self):
+        if self.grid is not None:
+            return grid_spec(*self.grid)
+        # Generate the underlying range based on the minimum and maximum K values
+        return grid_spec(0.6 * self.legs.K.min(), 1.3 * self.legs.K.max(), 500)
+
+    def _curve_is_fresh(self):
+        return self._curve is not None and self._curve_version == self.legs.version
+
+    def payoff_curve(self):
+        # Aggregate expiry payoff on the grid, rebuilt only when it cannot be updated in place
+        spec = self.grid_spec()
+        if not (self._curve_is_fresh() and spec == self._curve_spec):
+            with span('OrderOptions.payoff'):
+                self._curve = self.cache.get(('total', spec, legs_digest(self.legs)),
+                                             lambda: self._evaluate_curve(spec))
+            self._curve_spec = spec
+            self._curve_version = self.legs.version
+        return grid(spec), self._curve
+
+    def _evaluate_curve(self, spec):
+        count('legs_evaluated', len(self.legs))
+        count('grid_points', spec[2])
+        return self.payoff_model().evaluate(grid(spec))
+
+    def set_spot(self, S):
+        self.legs.set_spot(S)
 
     def calculate_prices(self):
-        prices = []
-        for option in self.options:
-            prices.append(option.calculate_price())
-        return prices
+        count('legs_evaluated', len(self.legs))
+        with span('OrderOptions.prices'):
+            return self.legs.calculate_prices()
     
     def total_prices(self):
-        total = 0
-        for price in self.calculate_prices():
-            total += price
-        return total
-    
-    def plot(self):
-        # Initialize a list to store all payoff curves
-        all_payoffs = []
+        count('legs_evaluated', len(self.legs))
+        with span('OrderOptions.prices'):
+            return self.legs.total_prices()
 
-        # Extract all K values from options
-        all_K_values = [option.K for option in self.options]
+    def model_pnl(self, underlying_range, T, sigma, r=0.0, elapsed=0.0):
+        return self.legs.model_pnl(underlying_range, T, sigma, r, elapsed)
 
-        # Find the minimum and maximum K values
-        min_K = min(all_K_values)
-        max_K = max(all_K_values)
+    def model_greeks(self, T, sigma, r=0.0, elapsed=0.0):
+        return self.legs.model_greeks(T, sigma, r, elapsed)
 
-        # Generate the underlying range based on the minimum and maximum K values
-        underlying_range = np.linspace(0.6 * min_K, 1.3 * max_K, 500)
-
-        # Calculate and plot payoff curve for each option
-        for option in self.options:
-            payoffs = [option.calculate_payoff(underlying_price) for underlying_price in underlying_range]
-            all_payoffs.append(payoffs)
-
-        # Calculate the total payoff curve by summing all individual payoffs
-        total_payoff = np.array(np.sum(all_payoffs, axis=0))
-
-        # Plot the total payoff curve
-        plt.plot(underlying_range, total_payoff, label='Total Payoff', color='black', linewidth=2)
-
-        plt.axhline(y=0, color='black')  # Plot horizontal line at y=0
-        plt.axvline(x=self.options[0].S, color='gray', linestyle='--', label='Market Price')
-        plt.xlabel('Underlying Price')
-        plt.ylabel('Payoff')
-        plt.title('Payoff Diagram')
-
-        # Calculate and plot breakeven points
-        breakeven_points = []
-        for i in range(len(total_payoff)-1):
-            if total_payoff[i] * total_payoff[i+1] < 0:  # If the signs are different, it means there is a crossing between these two elements
-                x1, x2 = underlying_range[i], underlying_range[i+1]
-                y1, y2 = total_payoff[i], total_payoff[i+1]
-                # Use linear interpolation to calculate the underlying_price at the crossing
-                breakeven_point = x1 - y1 * (x2 - x1) / (y2 - y1)
-                breakeven_points.append(breakeven_point)
-
-        for breakeven_point in breakeven_points:
-            plt.plot([breakeven_point], [0], 'bo', label=f'BEP: {breakeven_point:.2f}', alpha=0.3)
+    def implied_volatility(self, T, r=0.0, fallback=None):
+        return self.legs.implied_volatility(T, r, fallback)
+
+    def risk_surface(self, vol_shifts, elapsed, T, sigma, r=0.0, spots=None):
+        # Spot x vol x time scenario cube; spots default to the payoff diagram grid
+        if spots is None:
+            spots = grid(self.grid_spec())
+        return RiskSurface(self, spots, vol_shifts, elapsed, T, sigma, r)
+
+    def payoff_model(self):
+        return self.legs.payoff_model()
+
+    def breakeven_points(self):
+        with span('OrderOptions.breakevens'):
+            return self.payoff_model().breakeven_points()
+
+    def max_profit(self):
+        return self.payoff_model().max_profit()
+
+    def max_loss(self):
+        return self.payoff_model().max_loss()
+    
+    def curve_data(self):
+        underlying_range, payoffs = self.payoff_curve()
+        return {'underlying_range': underlying_range, 'payoffs': payoffs,
+                'market_price': self.legs.S[0], 'strikes': self.legs.K,
+                'breakeven_points': self.breakeven_points(),
+                'title': 'Payoff Diagram', 'loss_color': 'red', 'profit_color': 'green', 'zero_is_profit': True}
+
+    def plot(self, ax=None, fname=None, format=None):
+        # Draws on ax if given; fname (a path or buffer) saves headlessly via Agg
+        fig, ax, interactive = get_axes(ax, fname)
+
+        # Total payoff curve, memoized and maintained incrementally
+        data = self.curve_data()
+        underlying_range, total_payoff = data['underlying_range'], data['payoffs']
+
+        with span('OrderOptions.draw'):
+            # Plot the total payoff curve
+            ax.plot(underlying_range, total_payoff, label='Total Payoff', color='black', linewidth=2)
+
+            ax.axhline(y=0, color='black')  # Plot horizontal line at y=0
+            ax.axvline(x=self.legs.S[0], color='gray', linestyle='--', label='Market Price')
+            ax.set_xlabel('Underlying Price')
+            ax.set_ylabel('Payoff')
+            ax.set_title('Payoff Diagram')
+
+            # Exact breakeven points, including those outside the plotted range
+            breakeven_points = data['breakeven_points']
+
+            for breakeven_point in breakeven_points:
+                ax.plot([breakeven_point], [0], 'bo', label=f'BEP: {breakeven_point:.2f}', alpha=0.3)
         
-        # Loss Area
-        plt.fill_between(underlying_range, total_payoff, where=(total_payoff <= 0), color='red', alpha=0.2, label='Profit Area')
+        with span('OrderOptions.fill_between'):
+            # Loss Area
+            ax.fill_between(underlying_range, total_payoff, where=(total_payoff <= 0), color='red', alpha=0.2, label='Profit Area')
         
-        # Profit Area
-        plt.fill_between(underlying_range, total_payoff, where=(total_payoff >= 0), color='green', alpha=0.2, label='Loss Area')
-        plt.legend()
-        plt.grid(True)
-        plt.show()     
+            # Profit Area
+            ax.fill_between(underlying_range, total_payoff, where=profit_mask(total_payoff, data['zero_is_profit']), color='green', alpha=0.2, label='Loss Area')
+        ax.legend()
+        ax.grid(True)
+        return finish_figure(fig, interactive, fname, format)
 
 if __name__ == '__main__':
+    import sys
+    if len(sys.argv) > 1:
+        # Batch mode: python order_options.py positions.csv [--prices] [--plot FILE]
+        from position_io import main
+        main()
+        sys.exit()
+
     # Initialize an empty list to store options data
     options_data = []
 
@@ -0,0 +1,86 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from leg_store import payoff_kernel
+from instrumentation import count
+
+class PayoffCache():
+    # LRU memo of payoff curves keyed by leg parameters and grid spec, bounded both by
+    # entry count and by the total bytes held; a value bigger than max_bytes is returned
+    # but not kept, so one huge grid cannot flush everything else
+    def __init__(self, maxsize=1024, max_bytes=256 * 2**20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        # Cached value or None, counted as a hit or a miss
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            count('cache_hits')
+            return self._entries[key]
+        self.misses += 1
+        count('cache_misses')
+        return None
+
+    def put(self, key, value):
+        # Cached arrays are shared between callers, so they are frozen
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+        if key in self._entries:
+            self.nbytes -= _nbytes(self._entries.pop(key))
+        self._entries[key] = value
+        self.nbytes += size
+        while len(self._entries) > self.maxsize or self.nbytes > self.max_bytes:
+            self.nbytes -= _nbytes(self._entries.popitem(last=False)[1])
+        return value
+
+    def get(self, key, compute):
+        value = self.lookup(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize,
+                'nbytes': self.nbytes, 'max_bytes': self.max_bytes}
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return len(value) if isinstance(value, (bytes, bytearray, str)) else 0
+
+default_cache = PayoffCache()
+
+def grid_spec(low, high, n_points):
+    return (float(low), float(high), int(n_points))
+
+def grid(spec):
+    return np.linspace(*spec)
+
+def leg_curve(cache, spec, K, P, is_long, is_call):
+    key = ('leg', spec, float(K), float(P), bool(is_long), bool(is_call))
+    return cache.get(key, lambda: payoff_kernel(grid(spec), K, P, is_long, is_call))
+
+def legs_digest(legs):
+    # Content key of a whole LegStore; hashing the columns is cheaper than re-evaluating them
+    digest = hashlib.blake2b(digest_size=16)
+    for column in (legs.K, legs.P, legs.is_long, legs.is_call):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,200 @@
+import numpy as np
+from matplotlib.transforms import Bbox
+from matplotlib.widgets import Slider
+import rendering
+from rendering import new_figure
+
+class PayoffExplorer():
+    # Interactive payoff diagram for an OrderOptions. The spot line can be dragged, and
+    # sliders pick a leg and set its strike and premium. Each change swaps only that leg's
+    # curve (OrderOptions.update_leg on a pinned grid), then the line, fills and markers
+    # are blitted over a cached background of the axes, together with the sliders that
+    # moved; the axes, grid and legend are drawn only on a full redraw.
+    def __init__(self, order_options, fig=None):
+        self.order_options = order_options
+        if order_options.grid is None:
+            # A pinned grid lets leg edits update the aggregate curve incrementally
+            order_options.grid = order_options.grid_spec()
+        if fig is None:
+            if rendering._headless:
+                fig = new_figure((9, 7))
+            else:
+                import matplotlib.pyplot as plt
+                fig = plt.figure(figsize=(9, 7))
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.ax = fig.add_axes([0.1, 0.35, 0.85, 0.58])
+        self.leg = 0
+        self._background = None
+        self._slider_backgrounds = {}
+        self._dirty = set()
+        self._dragging = False
+        self._syncing = False
+        self._build()
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('button_press_event', self._on_press)
+        self.canvas.mpl_connect('motion_notify_event', self._on_motion)
+        self.canvas.mpl_connect('button_release_event', self._on_release)
+
+    def _build(self):
+        ax = self.ax
+        legs = self.order_options.legs
+        x, payoffs = self.order_options.payoff_curve()
+        ax.axhline(y=0, color='black')
+        ax.set_xlabel('Underlying Price')
+        ax.set_ylabel('Payoff')
+        ax.set_title('Payoff Diagram')
+        ax.grid(True)
+        self.payoff_line, = ax.plot(x, payoffs, label='Total Payoff', color='black', linewidth=2, animated=True)
+        self.spot_line = ax.axvline(x=legs.S[0], color='gray', linestyle='--', label='Market Price', animated=True)
+        self.breakeven_markers, = ax.plot([], [], 'bo', alpha=0.3, label='Breakeven Points', animated=True)
+        self.strike_marker, = ax.plot([], [], 'go', alpha=0.6, label='Selected Strike', animated=True)
+        # One polygon per fill, clipped at zero, so an update is a single set_verts each
+        self.loss_fill = ax.fill(x, np.minimum(payoffs, 0), color='red', alpha=0.2, label='Loss Area',
+                                 animated=True)[0]
+        self.profit_fill = ax.fill(x, np.maximum(payoffs, 0), color='green', alpha=0.2, label='Profit Area',
+                                   animated=True)[0]
+        self.price_text = ax.text(0.99, 0.97, '', transform=ax.transAxes, ha='right', va='top', animated=True)
+        ax.legend(loc='upper left')
+        self._rescale(payoffs)
+
+        n = len(legs)
+        k_low, k_high, _ = self.order_options.grid_spec()
+        p_high = max(2.0 * float(legs.P.max()), 1.0)
+        # Slider needs valmin < valmax, so a single leg gets a 0..1 range with the slider disabled
+        self.leg_slider = Slider(self.fig.add_axes([0.15, 0.22, 0.7, 0.03]), 'Leg', 0, max(n - 1, 1), valinit=0,
+                                 valstep=1)
+        if n == 1:
+            self.leg_slider.set_active(False)
+        self.strike_slider = Slider(self.fig.add_axes([0.15, 0.16, 0.7, 0.03]), 'Strike', k_low, k_high,
+                                    valinit=legs.K[0])
+        self.premium_slider = Slider(self.fig.add_axes([0.15, 0.10, 0.7, 0.03]), 'Premium', 0.0, p_high,
+                                     valinit=legs.P[0])
+        self.spot_slider = Slider(self.fig.add_axes([0.15, 0.04, 0.7, 0.03]), 'Spot', k_low, k_high,
+                                  valinit=legs.S[0])
+        self.sliders = (self.leg_slider, self.strike_slider, self.premium_slider, self.spot_slider)
+        for slider in self.sliders:
+            # Sliders are blitted with the plot instead of triggering full redraws
+            slider.drawon = False
+        self.leg_slider.on_changed(lambda value: self._from_slider(self.select_leg, int(value)))
+        self.strike_slider.on_changed(lambda value: self._from_slider(self.set_strike, value))
+        self.premium_slider.on_changed(lambda value: self._from_slider(self.set_premium, value))
+        self.spot_slider.on_changed(lambda value: self._from_slider(self.set_spot, value))
+        self._refresh_artists()
+
+    def _rescale(self, payoffs):
+        low, high = float(payoffs.min()), float(payoffs.max())
+        margin = 0.25 * max(high - low, 1.0)
+        self.ax.set_ylim(low - margin, high + margin)
+
+    def _from_slider(self, setter, value):
+        if not self._syncing:
+            setter(value)
+
+    def _sync(self, slider, value):
+        self._dirty.add(slider)
+        self._syncing = True
+        try:
+            slider.set_val(value)
+        finally:
+            self._syncing = False
+
+    def select_leg(self, index):
+        legs = self.order_options.legs
+        self.leg = min(max(int(index), 0), len(legs) - 1)
+        self._sync(self.leg_slider, self.leg)
+        self._sync(self.strike_slider, legs.K[self.leg])
+        self._sync(self.premium_slider, legs.P[self.leg])
+        self.update()
+
+    def set_strike(self, K):
+        self.order_options.update_leg(self.leg, K=K)
+        self._sync(self.strike_slider, K)
+        self.update()
+
+    def set_premium(self, P):
+        self.order_options.update_leg(self.leg, P=P)
+        self._sync(self.premium_slider, P)
+        self.update()
+
+    def set_spot(self, S):
+        self.order_options.set_spot(S)
+        self._sync(self.spot_slider, S)
+        self.update()
+
+    def _refresh_artists(self):
+        legs = self.order_options.legs
+        x, payoffs = self.order_options.payoff_curve()
+        self.payoff_line.set_ydata(payoffs)
+        self.loss_fill.set_xy(np.column_stack((np.r_[x, x[-1], x[0]], np.r_[np.minimum(payoffs, 0), 0, 0])))
+        self.profit_fill.set_xy(np.column_stack((np.r_[x, x[-1], x[0]], np.r_[np.maximum(payoffs, 0), 0, 0])))
+        self.spot_line.set_xdata([legs.S[0]] * 2)
+        breakeven_points = np.asarray(self.order_options.breakeven_points(), dtype=float)
+        self.breakeven_markers.set_data(breakeven_points, np.zeros(breakeven_points.size))
+        self.strike_marker.set_data([legs.K[self.leg]], [0])
+        self.price_text.set_text(f'Total Price: {self.order_options.total_prices():.2f}')
+        return payoffs
+
+    def _animated(self):
+        return (self.loss_fill, self.profit_fill, self.payoff_line, self.spot_line, self.breakeven_markers,
+                self.strike_marker, self.price_text)
+
+    def _slider_band(self, slider):
+        # Full-width strip around a slider, covering its label and value text
+        y0, y1 = slider.ax.bbox.y0, slider.ax.bbox.y1
+        pad = 0.5 * (y1 - y0)
+        return Bbox.from_extents(0, y0 - pad, self.fig.bbox.width, y1 + pad)
+
+    def _on_draw(self, event):
+        # Full redraws (resize, rescale) refresh the cached backgrounds
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._slider_backgrounds = {slider: self.canvas.copy_from_bbox(self._slider_band(slider))
+                                    for slider in self.sliders}
+        self._dirty.clear()
+        for artist in self._animated():
+            self.ax.draw_artist(artist)
+
+    def update(self):
+        payoffs = self._refresh_artists()
+        low, high = self.ax.get_ylim()
+        if self._background is None or payoffs.min() < low or payoffs.max() > high:
+            # The curve left the axes: rescale and fall back to one full redraw
+            self._rescale(payoffs)
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        for artist in self._animated():
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
+        # Only sliders whose value moved are repainted
+        for slider in self._dirty:
+            self.canvas.restore_region(self._slider_backgrounds[slider])
+            self.fig.draw_artist(slider.ax)
+            self.canvas.blit(self._slider_band(slider))
+        self._dirty.clear()
+        self.canvas.flush_events()
+
+    def _on_press(self, event):
+        if event.inaxes is self.ax and event.xdata is not None:
+            # Grab the spot line within a few pixels
+            spot_x = self.ax.transData.transform((self.order_options.legs.S[0], 0))[0]
+            self._dragging = abs(event.x - spot_x) < 8
+
+    def _on_motion(self, event):
+        if self._dragging and event.inaxes is self.ax and event.xdata is not None:
+            self.set_spot(event.xdata)
+
+    def _on_release(self, event):
+        self._dragging = False
+
+    def show(self):
+        import matplotlib.pyplot as plt
+        plt.show()
+
+if __name__ == '__main__':
+    from order_options import OrderOptions
+    rng = np.random.default_rng(0)
+    n = 120
+    order_options = OrderOptions.from_arrays(4000, rng.uniform(3400, 4600, n).round(-1), rng.uniform(10, 200, n).round(),
+                                             rng.choice(['long', 'short'], n), rng.choice(['call', 'put'], n))
+    PayoffExplorer(order_options).show()
@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import ipaddress
+import json
+import time
+from collections import deque
+import numpy as np
+from batch_strategies import BatchStrategies
+from leg_store import encode_direction, encode_option_type
+from payoff_cache import PayoffCache
+
+# Localhost HTTP/JSON service over the batch engine.
+#   POST /evaluate  {"legs": [[S, K, P, "long"|"short", "call"|"put"], ...],
+#                    "curve": true, "grid": [low, high, n_points]}
+#     -> {"price", "net_premium", "breakevens", "max_profit", "max_loss"[, "curve"]}
+#        (an unbounded max_profit or max_loss is null; "curve" is {"grid", "payoff"} and
+#        its x values are np.linspace(*grid), which is cheaper than encoding them)
+#   GET /stats      latency, throughput, batching and cache counters
+#   GET /health
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+class ServiceMetrics():
+    def __init__(self, window=10000):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.max_batch = 0
+        # Latencies of the most recent requests, for percentiles
+        self.latencies = deque(maxlen=window)
+
+    def record(self, latency):
+        self.requests += 1
+        self.latencies.append(latency)
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_requests += size
+        self.max_batch = max(self.max_batch, size)
+
+    def summary(self):
+        uptime = time.monotonic() - self.started
+        latencies = np.array(self.latencies) * 1e3
+        p50, p99 = np.percentile(latencies, [50, 99]) if latencies.size else (0.0, 0.0)
+        return {
+            'uptime': uptime,
+            'requests': self.requests,
+            'errors': self.errors,
+            'throughput': self.requests / uptime if uptime > 0 else 0.0,
+            'latency_mean_ms': float(latencies.mean()) if latencies.size else 0.0,
+            'latency_p50_ms': float(p50),
+            'latency_p99_ms': float(p99),
+            'batches': self.batches,
+            'batch_size_mean': self.batched_requests / self.batches if self.batches else 0.0,
+            'batch_size_max': self.max_batch,
+        }
+
+def parse_request(payload):
+    # Validates one /evaluate body; returns (cache key, legs, curve grid or None)
+    if not isinstance(payload, dict):
+        raise ValueError("The request body must be a JSON object.")
+    legs = payload.get('legs')
+    if not isinstance(legs, list) or not legs:
+        raise ValueError("'legs' must be a non-empty list of [S, K, P, LorS, option_type].")
+    try:
+        legs = [(float(S), float(K), float(P), str(LorS), str(option_type)) for S, K, P, LorS, option_type in legs]
+    except (TypeError, ValueError):
+        raise ValueError("Each leg must be [S, K, P, LorS, option_type].")
+    S, K, P, LorS, option_type = zip(*legs)
+    if not np.all(np.isfinite([S, K, P])):
+        raise ValueError("Leg S, K and P must be finite numbers.")
+    encode_direction(LorS)
+    encode_option_type(option_type)
+    grid = payload.get('grid')
+    if grid is not None:
+        message = "'grid' must be [low, high, n_points] with finite low < high and 2 <= n_points <= 100000."
+        try:
+            low, high, n_points = grid
+            grid = (float(low), float(high), int(n_points))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(message)
+        if not np.all(np.isfinite(grid[:2])) or not 2 <= grid[2] <= 100000 or grid[1] <= grid[0]:
+            raise ValueError(message)
+    elif payload.get('curve'):
+        # Same default range as OrderOptions.plot
+        grid = (0.6 * min(K), 1.3 * max(K), 500)
+    return (tuple(legs), grid), legs, grid
+
+def _bound(value):
+    return float(value) if np.isfinite(value) else None
+
+def evaluate_batch(requests):
+    # One vectorized pass for all (legs, grid) requests; curves are grouped by grid size
+    batch = BatchStrategies.from_strategies([legs for legs, grid in requests])
+    prices = batch.calculate_price()
+    premiums = np.bincount(batch.strategy_index, weights=np.where(batch.is_long, -batch.P, batch.P),
+                           minlength=len(batch))
+    breakevens = batch.breakeven_points()
+    max_profit = batch.max_profit()
+    max_loss = batch.max_loss()
+    results = [{'price': float(prices[i]), 'net_premium': float(premiums[i]),
+                'breakevens': breakevens[i].tolist(), 'max_profit': _bound(max_profit[i]),
+                'max_loss': _bound(max_loss[i])} for i in range(len(batch))]
+
+    by_size = {}
+    for i, (legs, grid) in enumerate(requests):
+        if grid is not None:
+            by_size.setdefault(grid[2], []).append(i)
+    for n_points, members in by_size.items():
+        members = np.array(members)
+        bounds = np.array([requests[i][1][:2] for i in members])
+        steps = np.linspace(0.0, 1.0, n_points)
+        grids = bounds[:, :1] + (bounds[:, 1:] - bounds[:, :1]) * steps[None, :]
+        sub = BatchStrategies.from_strategies([requests[i][0] for i in members])
+        payoffs = sub.payoff_matrix(grids)
+        for row, i in enumerate(members):
+            results[i]['curve'] = {'grid': list(requests[i][1]), 'payoff': payoffs[row].tolist()}
+    return results
+
+class PayoffService():
+    # Requests wait up to max_wait seconds (or until max_batch arrive) and are evaluated
+    # together; finished responses are kept in an LRU keyed by legs and grid.
+    def __init__(self, max_batch=256, max_wait=0.002, cache_size=4096):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = PayoffCache(cache_size)
+        self.metrics = ServiceMetrics()
+        self.queue = None
+        self.server = None
+        self._batcher = None
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        # A Unix socket path, or a TCP port on a loopback address only
+        self.queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batches())
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            if not ipaddress.ip_address(host).is_loopback:
+                raise ValueError("The payoff service only listens on loopback addresses.")
+            self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self._batcher.cancel()
+
+    async def serve_forever(self, host='127.0.0.1', port=8765, path=None):
+        server = await self.start(host, port, path)
+        async with server:
+            await server.serve_forever()
+
+    def stats(self):
+        summary = self.metrics.summary()
+        summary['cache'] = self.cache.stats()
+        return summary
+
+    async def evaluate(self, payload):
+        key, legs, grid = parse_request(payload)
+        body = self.cache.lookup(key)
+        if body is None:
+            future = asyncio.get_running_loop().create_future()
+            await self.queue.put((legs, grid, future))
+            body = self.cache.put(key, json.dumps(await future).encode())
+        return body
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            # Collect whatever arrives before the deadline, up to max_batch
+            while len(pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.metrics.record_batch(len(pending))
+            try:
+                results = evaluate_batch([(legs, grid) for legs, grid, future in pending])
+            except Exception as error:
+                # Requests were validated already, so this is a server fault, reported as a 500
+                failure = RuntimeError("Batch evaluation failed.")
+                failure.__cause__ = error
+                for legs, grid, future in pending:
+                    if not future.done():
+                        future.set_exception(failure)
+                continue
+            for (legs, grid, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split(None, 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                started = time.perf_counter()
+                status, response = await self._route(method, target, body)
+                self.metrics.record(time.perf_counter() - started)
+                if status != 200:
+                    self.metrics.errors += 1
+                keep_alive = headers.get('connection', '').lower() != 'close' and not version.startswith('HTTP/1.0')
+                writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(response)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, target, body):
+        path = target.split('?', 1)[0]
+        try:
+            if path == '/evaluate':
+                if method != 'POST':
+                    return 405, json.dumps({'error': 'Use POST.'}).encode()
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    return 400, json.dumps({'error': 'The request body must be valid JSON.'}).encode()
+                return 200, await self.evaluate(payload)
+            if path == '/stats':
+                return 200, json.dumps(self.stats()).encode()
+            if path == '/health':
+                return 200, b'{"status": "ok"}'
+            return 404, json.dumps({'error': f'Unknown path {path}.'}).encode()
+        except ValueError as error:
+            # parse_request and the leg encoders raise ValueError with a message meant for clients
+            return 400, json.dumps({'error': str(error)}).encode()
+        except Exception:
+            return 500, json.dumps({'error': 'Internal server error.'}).encode()
+
+async def load_test(host='127.0.0.1', port=8765, clients=32, requests_per_client=100, seed=0):
+    # Concurrent keep-alive clients posting random two-leg strategies
+    rng = np.random.default_rng(seed)
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        for _ in range(requests_per_client):
+            legs = [[4000, float(rng.integers(35, 45) * 100), float(rng.integers(1, 20) * 10),
+                     str(rng.choice(['long', 'short'])), str(rng.choice(['call', 'put']))] for _ in range(2)]
+            body = json.dumps({'legs': legs, 'curve': True}).encode()
+            writer.write(b"POST /evaluate HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                         + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    return clients * requests_per_client / (time.perf_counter() - started)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve payoff curves, prices and breakevens on localhost.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait', type=float, default=0.002, help='seconds to collect a micro-batch')
+    parser.add_argument('--cache-size', type=int, default=4096)
+    parser.add_argument('--load-test', action='store_true', help='start the service and load-test it in-process')
+    args = parser.parse_args(argv)
+
+    service = PayoffService(args.max_batch, args.max_wait, args.cache_size)
+    if args.load_test:
+        async def run():
+            await service.start(args.host, args.port)
+            rate = await load_test(args.host, args.port)
+            await service.close()
+            print("Requests/s:", rate)
+            print(service.stats())
+        asyncio.run(run())
+        return
+    asyncio.run(service.serve_forever(args.host, args.port, args.unix))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import numpy as np
+
+def segment_roots(slopes, intercepts, lower, upper, rtol=1e-9):
+    # Zero of each segment line and whether it lies on the segment. A crossing at a strike
+    # may round just outside both neighbouring segments, so roots within rtol of a segment
+    # end are snapped onto it and accepted; callers dedupe the snapped copies.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roots = -intercepts / slopes
+        tol = rtol * np.maximum(np.maximum(np.abs(lower), np.where(np.isfinite(upper), np.abs(upper), 0.0)), 1.0)
+        near_lower = np.abs(roots - lower) <= tol
+        near_upper = np.abs(roots - upper) <= tol
+        roots = np.where(near_lower, lower, np.where(near_upper, upper, roots))
+        inside = (slopes != 0) & (((roots > lower) & (roots <= upper)) | near_lower | near_upper)
+    return roots, inside
+
+class PiecewiseLinearPayoff():
+    # Expiry payoff of a set of legs stored as one line per segment between sorted strikes.
+    # Segment 0 covers [0, strikes[0]], segment i covers (strikes[i-1], strikes[i]],
+    # the last segment runs from the highest strike to infinity.
+    def __init__(self, K, P, is_long, is_call):
+        K = np.asarray(K, dtype=float).ravel()
+        P = np.asarray(P, dtype=float).ravel()
+        sign = np.where(np.asarray(is_long, dtype=bool).ravel(), 1.0, -1.0)
+        is_call = np.asarray(is_call, dtype=bool).ravel()
+        if K.size == 0:
+            raise ValueError("At least one option is required.")
+
+        # Line left of every strike: calls are worthless, puts are in the money
+        slope0 = np.sum(np.where(is_call, 0.0, -sign))
+        intercept0 = np.sum(np.where(is_call, -sign * P, sign * (K - P)))
+
+        # Crossing a strike adds sign * (x - K) for calls and puts alike
+        self.strikes, index = np.unique(K, return_inverse=True)
+        d_slope = np.zeros(self.strikes.size)
+        d_intercept = np.zeros(self.strikes.size)
+        np.add.at(d_slope, index, sign)
+        np.add.at(d_intercept, index, -sign * K)
+
+        self.slopes = np.concatenate(([slope0], slope0 + np.cumsum(d_slope)))
+        self.intercepts = np.concatenate(([intercept0], intercept0 + np.cumsum(d_intercept)))
+
+    @classmethod
+    def from_options(cls, options):
+        K = [option.K for option in options]
+        P = [option.P for option in options]
+        is_long = []
+        is_call = []
+        for option in options:
+            if option.LorS not in ('long', 'short'):
+                raise ValueError("Invalid option direction. Please specify 'long' or 'short'.")
+            if option.option_type not in ('call', 'put'):
+                raise ValueError("Invalid option type. Please specify 'call' or 'put'.")
+            is_long.append(option.LorS == 'long')
+            is_call.append(option.option_type == 'call')
+        return cls(K, P, is_long, is_call)
+
+    def evaluate(self, underlying_price):
+        # Binary search for the segment of every price: O(log legs) per point
+        underlying_price = np.asarray(underlying_price, dtype=float)
+        segment = np.searchsorted(self.strikes, underlying_price, side='left')
+        payoff = self.slopes[segment] * underlying_price + self.intercepts[segment]
+        if payoff.ndim == 0:
+            return payoff.item()
+        return payoff
+
+    def breakeven_points(self):
+        lower = np.concatenate(([0.0], self.strikes))
+        upper = np.concatenate((self.strikes, [np.inf]))
+        roots, inside = segment_roots(self.slopes, self.intercepts, lower, upper)
+        return np.unique(roots[inside])
+
+    def max_profit(self):
+        if self.slopes[-1] > 0:
+            return np.inf
+        return float(np.max(self.evaluate(np.concatenate(([0.0], self.strikes)))))
+
+    def max_loss(self):
+        if self.slopes[-1] < 0:
+            return -np.inf
+        return float(np.min(self.evaluate(np.concatenate(([0.0], self.strikes)))))
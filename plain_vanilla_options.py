@@ -1,5 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from rendering import get_axes, finish_figure
 
 class PlainVanillaOptions:
     def __init__(self, S, K, P, LorS, option_type):
@@ -31,69 +31,92 @@ class PlainVanillaOptions:
         return option_price
     
     def calculate_payoff(self, underlying_price):
+        # Accepts a scalar or an ndarray of underlying prices
+        underlying_price = np.asarray(underlying_price, dtype=float)
         if self.option_type == 'call':
             if self.LorS == 'long':
-                payoff = max(0, underlying_price - self.K) - self.P
+                payoff = np.maximum(0, underlying_price - self.K) - self.P
             elif self.LorS == 'short':
-                payoff = min(0, self.K - underlying_price) + self.P
+                payoff = np.minimum(0, self.K - underlying_price) + self.P
+            else:
+                raise ValueError("Invalid option direction. Please specify 'long' or 'short'.")
             
         elif self.option_type == 'put':
             if self.LorS == 'long':
-                payoff = max(0, self.K - underlying_price) - self.P
+                payoff = np.maximum(0, self.K - underlying_price) - self.P
             elif self.LorS == 'short':
-                payoff = min(0, underlying_price - self.K) + self.P
+                payoff = np.minimum(0, underlying_price - self.K) + self.P
+            else:
+                raise ValueError("Invalid option direction. Please specify 'long' or 'short'.")
+        else:
+            raise ValueError("Invalid option type. Please specify 'call' or 'put'.")
 
+        if payoff.ndim == 0:
+            return payoff.item()
         return payoff
 
-    def plot_payoff(self, LorS, option_type):
+    def curve_data(self):
+        underlying_range = np.linspace(0.6 * self.S, 1.3 * self.K, 100)
+        if self.option_type == 'call':
+            breakeven_point = self.K + self.P
+        else:
+            breakeven_point = self.K - self.P
+        return {'underlying_range': underlying_range, 'payoffs': self.calculate_payoff(underlying_range),
+                'market_price': self.S, 'strikes': [self.K], 'breakeven_points': [breakeven_point],
+                'title': self.LorS + ' ' + self.option_type, 'loss_color': 'red', 'profit_color': 'green',
+                'zero_is_profit': False}
+
+    def plot_payoff(self, LorS, option_type, ax=None, fname=None, format=None):
+        # Draws on ax if given; fname (a path or buffer) saves headlessly via Agg
+        fig, ax, interactive = get_axes(ax, fname)
         underlying_range = np.linspace(0.6 * self.S, 1.3 * self.K, 100)
-        payoffs = [self.calculate_payoff(underlying_price) for underlying_price in underlying_range]
-        plt.plot(underlying_range, payoffs, label='Payoff')
-        plt.axhline(y=0, color='black')
-        plt.axvline(x=self.S, color='r', linestyle='--', label='Market Price')
-        plt.text(self.K, -5, f'K: {self.K:.2f}', va='top', ha='center', color='green')
-        plt.xlabel('Underlying Price')
-        plt.ylabel('Payoff')
-        plt.title(LorS + ' ' + option_type)
-        plt.grid(True)
+        payoffs = self.calculate_payoff(underlying_range)
+        ax.plot(underlying_range, payoffs, label='Payoff')
+        ax.axhline(y=0, color='black')
+        ax.axvline(x=self.S, color='r', linestyle='--', label='Market Price')
+        ax.text(self.K, -5, f'K: {self.K:.2f}', va='top', ha='center', color='green')
+        ax.set_xlabel('Underlying Price')
+        ax.set_ylabel('Payoff')
+        ax.set_title(LorS + ' ' + option_type)
+        ax.grid(True)
 
         # Calculate and plot breakeven point for call option
         if self.option_type == 'call':
             breakeven_point = self.K + self.P
-            plt.scatter(breakeven_point, 0, color='blue', label='Breakeven Point')
+            ax.scatter(breakeven_point, 0, color='blue', label='Breakeven Point')
             if LorS == 'long': 
                 # Loss Area
-                plt.fill_between(underlying_range, payoffs, where=(underlying_range <= breakeven_point), color='red', alpha=0.2, label='Profit Area')
+                ax.fill_between(underlying_range, payoffs, where=(underlying_range <= breakeven_point), color='red', alpha=0.2, label='Profit Area')
                 # Profit Area
-                plt.fill_between(underlying_range, payoffs, where=(underlying_range > breakeven_point), color='green', alpha=0.3, label='Loss Area')
+                ax.fill_between(underlying_range, payoffs, where=(underlying_range > breakeven_point), color='green', alpha=0.3, label='Loss Area')
             elif LorS == 'short':
                 # Loss Area
-                plt.fill_between(underlying_range, payoffs, where=(underlying_range >= breakeven_point), color='red', alpha=0.3, label='Profit Area')
+                ax.fill_between(underlying_range, payoffs, where=(underlying_range >= breakeven_point), color='red', alpha=0.3, label='Profit Area')
                 # Profit Area
-                plt.fill_between(underlying_range, payoffs, where=(underlying_range < breakeven_point), color='green', alpha=0.3, label='Loss Area')
-            plt.text(breakeven_point, 0, f'BEP: {breakeven_point:.2f}', va='bottom', ha='right', color='blue')
+                ax.fill_between(underlying_range, payoffs, where=(underlying_range < breakeven_point), color='green', alpha=0.3, label='Loss Area')
+            ax.text(breakeven_point, 0, f'BEP: {breakeven_point:.2f}', va='bottom', ha='right', color='blue')
 
         # Calculate and plot breakeven point for put option
         elif self.option_type == 'put':
             breakeven_point = self.K - self.P
-            plt.scatter(breakeven_point, 0, color='blue', label='Breakeven Point')
+            ax.scatter(breakeven_point, 0, color='blue', label='Breakeven Point')
             if LorS == 'long': 
                 # Loss Area
-                plt.fill_between(underlying_range, payoffs, where=(underlying_range >= breakeven_point), color='red', alpha=0.2, label='Profit Area')
+                ax.fill_between(underlying_range, payoffs, where=(underlying_range >= breakeven_point), color='red', alpha=0.2, label='Profit Area')
                 # Profit Area
-                plt.fill_between(underlying_range, payoffs, where=(underlying_range < breakeven_point), color='green', alpha=0.3, label='Loss Area')
+                ax.fill_between(underlying_range, payoffs, where=(underlying_range < breakeven_point), color='green', alpha=0.3, label='Loss Area')
             elif LorS == 'short':
                 # Loss Area
-                plt.fill_between(underlying_range, payoffs, where=(underlying_range <= breakeven_point), color='red', alpha=0.3, label='Profit Area')
+                ax.fill_between(underlying_range, payoffs, where=(underlying_range <= breakeven_point), color='red', alpha=0.3, label='Profit Area')
                 # Profit Area
-                plt.fill_between(underlying_range, payoffs, where=(underlying_range > breakeven_point), color='green', alpha=0.3, label='Loss Area')
-            plt.text(breakeven_point, 0, f'BEP: {breakeven_point:.2f}', va='bottom', ha='right', color='blue')
+                ax.fill_between(underlying_range, payoffs, where=(underlying_range > breakeven_point), color='green', alpha=0.3, label='Loss Area')
+            ax.text(breakeven_point, 0, f'BEP: {breakeven_point:.2f}', va='bottom', ha='right', color='blue')
         
         else:
             raise ValueError("Invalid option type. Please specify 'call' or 'put'.")
         
-        plt.legend()
-        plt.show()
+        ax.legend()
+        return finish_figure(fig, interactive, fname, format)
 
 if __name__ == '__main__':
 
@@ -0,0 +1,140 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from batch_strategies import BatchStrategies
+from leg_store import LegStore, encode_direction, encode_option_type
+from order_options import OrderOptions
+
+def _payoff_job(batch, underlying_range):
+    return batch.payoff_matrix(underlying_range)
+
+class Portfolio():
+    # Legs of many underlyings grouped by symbol into one CSR BatchStrategies (one
+    # "strategy" per underlying), so every per-underlying result is a single vectorized
+    # pass. processes= splits the underlyings into contiguous shards across workers.
+    def __init__(self, symbols, S, K, P, LorS, option_type):
+        symbols = np.asarray(symbols)
+        K = np.asarray(K, dtype=float).ravel()
+        columns = [np.broadcast_to(np.asarray(values, dtype=float), K.size) for values in (S, P)]
+        columns.append(np.broadcast_to(encode_direction(LorS), K.size))
+        columns.append(np.broadcast_to(encode_option_type(option_type), K.size))
+        self.symbols, group = np.unique(np.broadcast_to(symbols, K.size), return_inverse=True)
+        order = np.argsort(group, kind='stable')
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(group, minlength=self.symbols.size))))
+        S, P, is_long, is_call = [column[order] for column in columns]
+        self.batch = BatchStrategies(offsets, S, K[order], P, is_long, is_call)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols.tolist())}
+
+    @classmethod
+    def from_books(cls, books):
+        # books maps symbol -> OrderOptions (or anything with a .legs LegStore)
+        symbols, columns = [], [[], [], [], [], []]
+        for symbol, book in books.items():
+            legs = getattr(book, 'legs', book)
+            symbols.append(np.full(len(legs), symbol, dtype=object))
+            for column, values in zip(columns, (legs.S, legs.K, legs.P, legs.is_long, legs.is_call)):
+                column.append(values)
+        return cls(np.concatenate(symbols).astype(str), *[np.concatenate(column) for column in columns])
+
+    def __len__(self):
+        return self.symbols.size
+
+    @property
+    def offsets(self):
+        return self.batch.offsets
+
+    def _group(self, symbol):
+        i = self._index[symbol]
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def book(self, symbol):
+        # OrderOptions view over one underlying's legs, e.g. for its payoff diagram
+        rows = self._group(symbol)
+        batch = self.batch
+        return OrderOptions.from_legs(LegStore.from_columns(batch.S[rows], batch.K[rows], batch.P[rows],
+                                                            batch.is_long[rows], batch.is_call[rows]))
+
+    def spots(self):
+        # Current spot of each underlying, taken from its first leg
+        return self.batch.S[self.offsets[:-1]]
+
+    def calculate_prices(self):
+        return self.batch.calculate_price()
+
+    def net_premiums(self):
+        # Premium received (positive) or paid (negative) per underlying
+        batch = self.batch
+        return np.bincount(batch.strategy_index, weights=np.where(batch.is_long, -batch.P, batch.P),
+                           minlength=len(self))
+
+    def breakeven_points(self):
+        return dict(zip(self.symbols.tolist(), self.batch.breakeven_points()))
+
+    def max_profit(self):
+        return self.batch.max_profit()
+
+    def max_loss(self):
+        return self.batch.max_loss()
+
+    def grids(self, n_points=500):
+        # Per-underlying plot grid, 0.6 x lowest to 1.3 x highest strike as in OrderOptions
+        low = np.full(len(self), np.inf)
+        high = np.full(len(self), -np.inf)
+        np.minimum.at(low, self.batch.strategy_index, self.batch.K)
+        np.maximum.at(high, self.batch.strategy_index, self.batch.K)
+        steps = np.linspace(0.0, 1.0, n_points)
+        return 0.6 * low[:, None] + (1.3 * high - 0.6 * low)[:, None] * steps[None, :]
+
+    def _shards(self, processes):
+        # Contiguous underlying ranges holding roughly equal numbers of legs
+        targets = np.linspace(0, self.offsets[-1], processes + 1)
+        stops = np.unique(np.concatenate(([0], np.searchsorted(self.offsets, targets[1:-1]), [len(self)])))
+        return list(zip(stops[:-1], stops[1:]))
+
+    def _shard(self, start, stop):
+        batch = self.batch
+        lo, hi = self.offsets[start], self.offsets[stop]
+        return BatchStrategies(self.offsets[start:stop + 1] - lo, batch.S[lo:hi], batch.K[lo:hi], batch.P[lo:hi],
+                               batch.is_long[lo:hi], batch.is_call[lo:hi])
+
+    def _payoffs(self, underlying_range, processes):
+        # underlying_range is N x G, one row per underlying
+        if processes is None or processes <= 1 or len(self) < 2:
+            return self.batch.payoff_matrix(underlying_range)
+        shards = self._shards(processes)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            blocks = pool.map(_payoff_job, [self._shard(start, stop) for start, stop in shards],
+                              [underlying_range[start:stop] for start, stop in shards])
+            return np.concatenate(list(blocks))
+
+    def curves(self, n_points=500, processes=None):
+        # (grids, payoffs): N x n_points expiry payoff curves, rows in self.symbols order
+        grids = self.grids(n_points)
+        return grids, self._payoffs(grids, processes)
+
+    def scenario_pnl(self, spots, processes=None):
+        # spots: one spot per underlying, an n_scenarios x N array, or a dict symbol -> spot(s)
+        # (missing symbols stay at their current spot). Returns (per-underlying expiry P&L
+        # with shape n_scenarios x N, portfolio P&L per scenario).
+        if isinstance(spots, dict):
+            n_scenarios = max((np.size(value) for value in spots.values()), default=1)
+            scenario = np.repeat(self.spots()[None, :], n_scenarios, axis=0)
+            for symbol, value in spots.items():
+                scenario[:, self._index[symbol]] = value
+        else:
+            scenario = np.atleast_2d(np.asarray(spots, dtype=float))
+        pnl = self._payoffs(np.ascontiguousarray(scenario.T), processes).T
+        return pnl, pnl.sum(axis=1)
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    n = 100000
+    symbols = np.char.add('U', rng.integers(0, 300, n).astype(str))
+    spot = dict(zip(np.unique(symbols).tolist(), rng.uniform(50, 500, 300)))
+    S = np.vectorize(spot.get)(symbols)
+    portfolio = Portfolio(symbols, S, (S * rng.uniform(0.8, 1.2, n)).round(), rng.uniform(1, 20, n),
+                          rng.choice(['long', 'short'], n), rng.choice(['call', 'put'], n))
+    grids, payoffs = portfolio.curves()
+    print("Underlyings:", len(portfolio), "Curves:", payoffs.shape)
+    print("Net Premium:", portfolio.net_premiums().sum())
+    shocks = portfolio.spots()[None, :] * np.array([[0.9], [1.0], [1.1]])
+    print("Scenario P&L:", portfolio.scenario_pnl(shocks)[1])
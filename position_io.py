@@ -0,0 +1,126 @@
+import argparse
+import itertools
+import numpy as np
+from leg_store import LegStore, encode_direction, encode_option_type
+from order_options import OrderOptions
+from batch_strategies import BatchStrategies
+
+# Binary position layout: one record per leg, loadable with np.load(mmap_mode='r')
+LEG_DTYPE = np.dtype([('S', 'f8'), ('K', 'f8'), ('P', 'f8'), ('is_long', '?'), ('is_call', '?')])
+
+CSV_COLUMNS = ('S', 'K', 'P', 'LorS', 'option_type')
+
+def iter_csv_chunks(path, chunk_size=100000):
+    # Streams a CSV with a header naming S, K, P, LorS, option_type (and optionally
+    # strategy) as column arrays, chunk_size rows at a time
+    with open(path) as f:
+        header = [name.strip() for name in f.readline().split(',')]
+        missing = [name for name in CSV_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+        position = {name: header.index(name) for name in header}
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                break
+            rows = np.char.strip(np.loadtxt(lines, delimiter=',', dtype=str, ndmin=2))
+            chunk = {
+                'S': rows[:, position['S']].astype(float),
+                'K': rows[:, position['K']].astype(float),
+                'P': rows[:, position['P']].astype(float),
+                'is_long': encode_direction(rows[:, position['LorS']]),
+                'is_call': encode_option_type(rows[:, position['option_type']]),
+            }
+            if 'strategy' in position:
+                chunk['strategy'] = rows[:, position['strategy']].astype(np.int64)
+            yield chunk
+
+def open_npy(path):
+    # Memory-mapped structured array; nothing is read until a column is touched
+    return np.load(path, mmap_mode='r')
+
+def iter_npy_chunks(path, chunk_size=100000):
+    records = open_npy(path)
+    for start in range(0, len(records), chunk_size):
+        block = records[start:start + chunk_size]
+        yield {name: block[name] for name in records.dtype.names}
+
+def iter_chunks(path, chunk_size=100000):
+    if str(path).endswith('.npy'):
+        return iter_npy_chunks(path, chunk_size)
+    return iter_csv_chunks(path, chunk_size)
+
+def save_npy(legs, path):
+    records = np.empty(len(legs), dtype=LEG_DTYPE)
+    for name in LEG_DTYPE.names:
+        records[name] = getattr(legs, name)
+    np.save(path, records)
+
+def load_legs(path, chunk_size=100000):
+    # .npy snapshots are wrapped in place; CSV files are streamed into the columns
+    if str(path).endswith('.npy'):
+        records = open_npy(path)
+        return LegStore.from_columns(records['S'], records['K'], records['P'], records['is_long'],
+                                     records['is_call'])
+    legs = LegStore(capacity=chunk_size)
+    for chunk in iter_csv_chunks(path, chunk_size):
+        legs.extend(chunk['S'], chunk['K'], chunk['P'], chunk['is_long'], chunk['is_call'])
+    return legs
+
+def load_order_options(path, chunk_size=100000):
+    return OrderOptions.from_legs(load_legs(path, chunk_size))
+
+def iter_strategy_batches(path, chunk_size=100000):
+    # Yields BatchStrategies of complete strategies; rows of one strategy must be
+    # contiguous and the last strategy of a chunk is carried into the next one
+    carry = None
+    for chunk in iter_chunks(path, chunk_size):
+        if 'strategy' not in chunk:
+            raise ValueError("Strategy batches need a 'strategy' column.")
+        if carry is not None:
+            chunk = {name: np.concatenate((carry[name], chunk[name])) for name in chunk}
+        ids = chunk['strategy']
+        others = np.flatnonzero(ids != ids[-1])
+        tail = others[-1] + 1 if others.size else 0
+        carry = {name: values[tail:] for name, values in chunk.items()}
+        if tail:
+            yield _batch({name: values[:tail] for name, values in chunk.items()})
+    if carry is not None and len(carry['strategy']):
+        yield _batch(carry)
+
+def _batch(chunk):
+    ids = chunk['strategy']
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    offsets = np.concatenate((starts, [len(ids)]))
+    batch = BatchStrategies(offsets, chunk['S'], chunk['K'], chunk['P'], chunk['is_long'], chunk['is_call'])
+    batch.ids = ids[starts]
+    return batch
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Price a position file and report its breakevens.')
+    parser.add_argument('path', help='CSV (S,K,P,LorS,option_type[,strategy]) or .npy position file')
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--prices', action='store_true', help='print every leg price')
+    parser.add_argument('--strategies', action='store_true', help='evaluate each strategy id separately')
+    parser.add_argument('--plot', metavar='FILE', help='write the payoff diagram to FILE')
+    args = parser.parse_args(argv)
+
+    if args.strategies:
+        for batch in iter_strategy_batches(args.path, args.chunk_size):
+            for strategy, price, breakeven_points in zip(batch.ids, batch.calculate_price(),
+                                                         batch.breakeven_points()):
+                print(f"Strategy {strategy}: Price: {price} Breakeven Points: {breakeven_points}")
+        return
+
+    order_options = load_order_options(args.path, args.chunk_size)
+    if args.prices:
+        print("Option Prices:", order_options.calculate_prices())
+    print("Total Price:", order_options.total_prices())
+    print("Breakeven Points:", order_options.breakeven_points())
+    print("Max Profit:", order_options.max_profit())
+    print("Max Loss:", order_options.max_loss())
+    if args.plot:
+        order_options.plot(fname=args.plot)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import io
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.patches import Patch
+from instrumentation import span, count
+
+# When headless, plot() methods never touch pyplot: they draw on an explicit Agg figure
+_headless = False
+
+def set_headless(headless=True):
+    global _headless
+    _headless = headless
+
+def new_figure(figsize=None):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def get_axes(ax=None, fname=None):
+    # Returns (fig, ax, interactive). Only the default call outside headless mode uses pyplot.
+    if ax is not None:
+        return ax.figure, ax, False
+    if _headless or fname is not None:
+        fig = new_figure()
+        return fig, fig.add_subplot(), False
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    return fig, ax, True
+
+def save_figure(fig, fname=None, format=None):
+    # fname may be a path or a writable buffer; without one the encoded bytes are returned
+    count('figures_rendered')
+    with span('figure.save'):
+        if fname is None:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=format or 'png')
+            return buffer.getvalue()
+        fig.savefig(fname, format=format)
+        return fname
+
+def finish_figure(fig, interactive, fname=None, format=None):
+    if fname is not None:
+        save_figure(fig, fname, format)
+    if interactive:
+        import matplotlib.pyplot as plt
+        plt.show()
+    return fig
+
+def profit_mask(payoffs, zero_is_profit=False):
+    # Points shaded as profit; curve_data()'s 'zero_is_profit' says whether a zero payoff counts
+    return payoffs >= 0 if zero_is_profit else payoffs > 0
+
+class PayoffTemplate():
+    # One figure whose axes, labels, legend and static lines are built once; each
+    # render only swaps line data and the two fill polygons before encoding.
+    def __init__(self, figsize=None):
+        self.fig = new_figure(figsize)
+        self.ax = self.fig.add_subplot()
+        ax = self.ax
+        ax.axhline(y=0, color='black')
+        ax.set_xlabel('Underlying Price')
+        ax.set_ylabel('Payoff')
+        ax.grid(True)
+        self.payoff_line, = ax.plot([], [], color='r', label='Payoff')
+        self.market_line = ax.axvline(x=0, color='gray', linestyle='--', label='Market Price')
+        self.strike_markers, = ax.plot([], [], 'go', alpha=0.3, label='Strikes')
+        self.breakeven_markers, = ax.plot([], [], 'bo', alpha=0.3, label='Breakeven Points')
+        self.loss_patch = Patch(color='red', alpha=0.2, label='Loss Area')
+        self.profit_patch = Patch(color='green', alpha=0.2, label='Profit Area')
+        ax.legend(handles=[self.payoff_line, self.market_line, self.strike_markers, self.breakeven_markers,
+                           self.loss_patch, self.profit_patch], loc='upper left')
+        self.fills = []
+
+    def draw(self, data):
+        ax = self.ax
+        x = data['underlying_range']
+        payoffs = data['payoffs']
+        self.payoff_line.set_data(x, payoffs)
+        self.market_line.set_xdata([data['market_price']] * 2)
+        strikes = np.asarray(data['strikes'], dtype=float)
+        self.strike_markers.set_data(strikes, np.zeros(strikes.size))
+        breakeven_points = np.asarray(data['breakeven_points'], dtype=float)
+        self.breakeven_markers.set_data(breakeven_points, np.zeros(breakeven_points.size))
+        ax.set_title(data['title'])
+
+        for fill in self.fills:
+            fill.remove()
+        self.loss_patch.set_color(data['loss_color'])
+        self.profit_patch.set_color(data['profit_color'])
+        self.fills = [
+            ax.fill_between(x, payoffs, where=(payoffs <= 0), color=data['loss_color'], alpha=0.2),
+            ax.fill_between(x, payoffs, where=profit_mask(payoffs, data.get('zero_is_profit', False)),
+                            color=data['profit_color'], alpha=0.2),
+        ]
+        ax.relim()
+        ax.autoscale_view()
+
+    def render(self, data, fname=None, format=None):
+        self.draw(data)
+        return save_figure(self.fig, fname, format)
+
+_worker_template = None
+
+def _render_jobs(jobs, format):
+    # Runs in a worker process; the template is built once per process
+    global _worker_template
+    if _worker_template is None:
+        _worker_template = PayoffTemplate()
+    return [_worker_template.render(strategy.curve_data(), fname, format) for strategy, fname in jobs]
+
+def render_batch(jobs, processes=None, format=None, chunk_size=64):
+    # jobs: (strategy, fname) pairs, where strategy has curve_data() and fname is a path
+    # or None for in-memory bytes. Returns the path or bytes for every job, in order.
+    # format=None takes the format from each path's extension, and PNG for in-memory bytes.
+    jobs = list(jobs)
+    chunks = [jobs[start:start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+    if processes is None or processes <= 1:
+        results = [_render_jobs(chunk, format) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_render_jobs, chunks, [format] * len(chunks)))
+    return [output for chunk in results for output in chunk]
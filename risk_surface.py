@@ -0,0 +1,133 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from black_scholes import BlackScholes
+from rendering import get_axes, finish_figure
+
+# Leg x vol x spot arrays alive at once while a leg chunk is priced (the temporaries of
+# BlackScholes.value plus the P&L block), and the fewest legs a tile leaves room for
+_TEMPORARIES = 8
+_MIN_LEG_CHUNK = 16
+
+def _leg_chunk(tile_size, max_bytes):
+    # Legs per chunk so that the output tile plus the chunk's temporaries fit in max_bytes
+    tile_bytes = 8 * max(tile_size, 1)
+    return max(int((max_bytes - tile_bytes) // (_TEMPORARIES * tile_bytes)), 1)
+
+def _tile(K, P, is_long, is_call, T, sigma, r, spots, vol_shifts, elapsed, max_bytes):
+    # Position P&L for one elapsed time over a block of vol shifts: legs (L,1,1) broadcast
+    # against vols (1,V,1) and spots (1,1,N), chunked over legs to bound memory
+    sign = np.where(is_long, 1.0, -1.0)
+    remaining = np.maximum(T - elapsed, 0.0)
+    total = np.zeros((vol_shifts.size, spots.size))
+    chunk = _leg_chunk(total.size, max_bytes)
+    for lo in range(0, K.size, chunk):
+        hi = lo + chunk
+        shifted = np.maximum(sigma[lo:hi, None, None] + vol_shifts[None, :, None], 0.0)
+        engine = BlackScholes(K[lo:hi, None, None], remaining[lo:hi, None, None], shifted,
+                              r[lo:hi, None, None], is_call[lo:hi, None, None])
+        values = engine.value(spots[None, None, :]) - P[lo:hi, None, None]
+        total += np.tensordot(sign[lo:hi], values, axes=1)
+    return total
+
+def _tile_job(args):
+    return _tile(*args)
+
+class RiskSurface():
+    # Position P&L cube over elapsed time x vol shift x spot, shape (n_time, n_vol, n_spot).
+    # elapsed is in years from today (0 is T+0); vol_shifts are added to each leg's sigma.
+    # The cube is built tile by tile (one elapsed time and a block of vol shifts), so it can
+    # stream into a memory-mapped .npy file larger than RAM.
+    def __init__(self, position, spots, vol_shifts, elapsed, T, sigma, r=0.0):
+        legs = getattr(position, 'legs', position)
+        n = len(legs)
+        self.K = np.array(legs.K, dtype=float)
+        self.P = np.array(legs.P, dtype=float)
+        self.is_long = np.array(legs.is_long, dtype=bool)
+        self.is_call = np.array(legs.is_call, dtype=bool)
+        self.T = np.broadcast_to(np.asarray(T, dtype=float), n)
+        self.sigma = np.broadcast_to(np.asarray(sigma, dtype=float), n)
+        self.r = np.broadcast_to(np.asarray(r, dtype=float), n)
+        self.spots = np.atleast_1d(np.asarray(spots, dtype=float))
+        self.vol_shifts = np.atleast_1d(np.asarray(vol_shifts, dtype=float))
+        self.elapsed = np.atleast_1d(np.asarray(elapsed, dtype=float))
+        self.market_price = legs.S[0]
+        self.cube = None
+
+    @property
+    def shape(self):
+        return (self.elapsed.size, self.vol_shifts.size, self.spots.size)
+
+    def _tiles(self, max_bytes):
+        # (time index, vol slice) pairs. Tiles are sized so the budget also covers the
+        # temporaries of at least _MIN_LEG_CHUNK legs, keeping _tile vectorized over legs;
+        # only a single spot row too big for that budget gets fewer legs per chunk
+        row_bytes = 8 * max(self.spots.size, 1)
+        legs = min(_MIN_LEG_CHUNK, self.K.size)
+        vol_block = max(int(max_bytes // (row_bytes * (1 + _TEMPORARIES * legs))), 1)
+        for t in range(self.elapsed.size):
+            for lo in range(0, self.vol_shifts.size, vol_block):
+                yield t, slice(lo, min(lo + vol_block, self.vol_shifts.size))
+
+    def compute(self, path=None, processes=None, max_bytes=64 * 2**20):
+        # With path, the cube is written to a .npy memmap opened with np.load(mmap_mode='r')
+        if path is not None:
+            out = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=self.shape)
+        else:
+            out = np.empty(self.shape)
+        tiles = list(self._tiles(max_bytes))
+        jobs = [(self.K, self.P, self.is_long, self.is_call, self.T, self.sigma, self.r, self.spots,
+                 self.vol_shifts[vols], self.elapsed[t], max_bytes) for t, vols in tiles]
+        if processes is None or processes <= 1:
+            results = map(_tile_job, jobs)
+            for (t, vols), values in zip(tiles, results):
+                out[t, vols] = values
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                for (t, vols), values in zip(tiles, pool.map(_tile_job, jobs)):
+                    out[t, vols] = values
+        if path is not None:
+            out.flush()
+        self.cube = out
+        return out
+
+    def _cube(self):
+        return self.compute() if self.cube is None else self.cube
+
+    def _nearest(self, values, value):
+        return int(np.abs(values - value).argmin())
+
+    def heatmap(self, elapsed=0.0):
+        # Vol shift x spot slice at the time closest to `elapsed`
+        return self._cube()[self._nearest(self.elapsed, elapsed)]
+
+    def term_structure(self, vol_shift=0.0):
+        # Elapsed time x spot slice at the vol shift closest to `vol_shift`
+        return self._cube()[:, self._nearest(self.vol_shifts, vol_shift)]
+
+    def plot_heatmap(self, elapsed=0.0, ax=None, fname=None, format=None):
+        fig, ax, interactive = get_axes(ax, fname)
+        values = self.heatmap(elapsed)
+        limit = np.abs(values).max() or 1.0
+        mesh = ax.pcolormesh(self.spots, self.vol_shifts, values, cmap='RdYlGn', vmin=-limit, vmax=limit,
+                             shading='auto')
+        fig.colorbar(mesh, ax=ax, label='P&L')
+        ax.axvline(x=self.market_price, color='gray', linestyle='--', label='Market Price')
+        ax.set_xlabel('Underlying Price')
+        ax.set_ylabel('Volatility Shift')
+        ax.set_title(f'Risk Surface (t+{self.elapsed[self._nearest(self.elapsed, elapsed)] * 365:.0f}d)')
+        ax.legend()
+        return finish_figure(fig, interactive, fname, format)
+
+    def plot_term_structure(self, vol_shift=0.0, ax=None, fname=None, format=None):
+        fig, ax, interactive = get_axes(ax, fname)
+        curves = self.term_structure(vol_shift)
+        for elapsed, curve in zip(self.elapsed, curves):
+            ax.plot(self.spots, curve, label=f't+{elapsed * 365:.0f}d')
+        ax.axhline(y=0, color='black')
+        ax.axvline(x=self.market_price, color='gray', linestyle='--', label='Market Price')
+        ax.set_xlabel('Underlying Price')
+        ax.set_ylabel('Payoff')
+        ax.set_title(f'P&L by Time (vol shift {self.vol_shifts[self._nearest(self.vol_shifts, vol_shift)]:+.2f})')
+        ax.legend()
+        ax.grid(True)
+        return finish_figure(fig, interactive, fname, format)
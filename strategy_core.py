@@ -0,0 +1,166 @@
+import numpy as np
+from piecewise_payoff import PiecewiseLinearPayoff
+from leg_store import LegStore
+from rendering import get_axes, finish_figure, profit_mask
+from instrumentation import span, count
+
+class StrategyCore():
+    # Legs of a strategy and everything derived from them. The payoff model, plot curve,
+    # breakevens and net premium are computed on first access and kept until the legs
+    # change, so every named view built over one core shares them.
+    def __init__(self, *options):
+        S, K, P, LorS, option_type = zip(*options)
+        self.legs = LegStore.from_arrays(S, K, P, LorS, option_type)
+        self._version = None
+
+    def _derived(self):
+        if self._version != self.legs.version:
+            self._payoff_model = None
+            self._curve = None
+            self._breakevens = None
+            self._net_premium = None
+            self._version = self.legs.version
+        return self
+
+    @property
+    def payoff_model(self):
+        if self._derived()._payoff_model is None:
+            self._payoff_model = PiecewiseLinearPayoff(self.legs.K, self.legs.P, self.legs.is_long, self.legs.is_call)
+        return self._payoff_model
+
+    def curve(self):
+        # (underlying_range, payoffs) on the plot grid; shared arrays, so they are read-only
+        if self._derived()._curve is None:
+            with span('StrategyCore.payoff'):
+                underlying_range = np.linspace(0.6 * self.legs.K.min(), 1.3 * self.legs.K.max(), 500)
+                payoffs = self.payoff_model.evaluate(underlying_range)
+            count('legs_evaluated', len(self.legs))
+            count('grid_points', underlying_range.size)
+            underlying_range.flags.writeable = False
+            payoffs.flags.writeable = False
+            self._curve = (underlying_range, payoffs)
+        return self._curve
+
+    def breakeven_points(self):
+        if self._derived()._breakevens is None:
+            with span('StrategyCore.breakevens'):
+                self._breakevens = self.payoff_model.breakeven_points()
+        return list(self._breakevens)
+
+    def net_premium(self):
+        # Premium received (positive) or paid (negative) to open the position
+        if self._derived()._net_premium is None:
+            self._net_premium = float(np.sum(np.where(self.legs.is_long, -self.legs.P, self.legs.P)))
+        return self._net_premium
+
+    def calculate_price(self):
+        # Depends on spot, which set_spot moves without a version bump, so never cached
+        return self.legs.total_prices()
+
+    def max_profit(self):
+        return self.payoff_model.max_profit()
+
+    def max_loss(self):
+        return self.payoff_model.max_loss()
+
+    def model_pnl(self, underlying_range, T, sigma, r=0.0, elapsed=0.0):
+        return self.legs.model_pnl(underlying_range, T, sigma, r, elapsed)
+
+class TwoLegStrategy():
+    # Presentation of a two-leg StrategyCore; subclasses set the title and fill colours.
+    # Pass core= to build several views over the same legs without recomputing them.
+    title = 'Payoff Diagram'
+    loss_color = 'red'
+    profit_color = 'green'
+    # Whether zero payoff is shaded as profit rather than loss
+    zero_is_profit = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._draw_span = cls.__name__ + '.draw'
+        cls._fill_span = cls.__name__ + '.fill_between'
+
+    def __init__(self, option1, option2, core=None):
+        self.S1, self.K1, self.P1, self.LorS1, self.option_type1 = option1
+        self.S2, self.K2, self.P2, self.LorS2, self.option_type2 = option2
+        self.core = StrategyCore(option1, option2) if core is None else core
+        self._options = None
+
+    @property
+    def legs(self):
+        return self.core.legs
+
+    @property
+    def payoff_model(self):
+        return self.core.payoff_model
+
+    @property
+    def plain_vanilla_options1(self):
+        return self._plain_vanilla_options()[0]
+
+    @property
+    def plain_vanilla_options2(self):
+        return self._plain_vanilla_options()[1]
+
+    def _plain_vanilla_options(self):
+        if self._options is None:
+            self._options = (self.legs.option(0), self.legs.option(1))
+        return self._options
+
+    def calculate_price(self):
+        return self.core.calculate_price()
+
+    def net_premium(self):
+        return self.core.net_premium()
+
+    def breakeven_points(self):
+        return self.core.breakeven_points()
+
+    def max_profit(self):
+        return self.core.max_profit()
+
+    def max_loss(self):
+        return self.core.max_loss()
+
+    def model_pnl(self, underlying_range, T, sigma, r=0.0, elapsed=0.0):
+        return self.core.model_pnl(underlying_range, T, sigma, r, elapsed)
+
+    def curve_data(self):
+        underlying_range, payoffs = self.core.curve()
+        return {'underlying_range': underlying_range, 'payoffs': payoffs, 'market_price': self.S1,
+                'strikes': [self.K1, self.K2], 'breakeven_points': self.core.breakeven_points(),
+                'title': self.title, 'loss_color': self.loss_color, 'profit_color': self.profit_color,
+                'zero_is_profit': self.zero_is_profit}
+
+    def plot(self, ax=None, fname=None, format=None):
+        # Draws on ax if given; fname (a path or buffer) saves headlessly via Agg
+        fig, ax, interactive = get_axes(ax, fname)
+
+        # Plot line of Payoff
+        data = self.curve_data()
+        underlying_range, payoffs = data['underlying_range'], data['payoffs']
+
+        with span(self._draw_span):
+            ax.plot(underlying_range, payoffs, label='Payoff', color = "r")
+            ax.axhline(y=0, color='black')
+            ax.axvline(x=self.S1, color='gray', linestyle='--', label='Market Price')
+            ax.plot(self.K1, 0, 'go', label=f'K1: {self.K1:.2f}', alpha=0.3)
+            ax.plot(self.K2, 0, 'go', label=f'K2: {self.K2:.2f}', alpha=0.3)
+            ax.set_xlabel('Underlying Price')
+            ax.set_ylabel('Payoff')
+            ax.set_title(self.title)
+            ax.grid(True)
+
+            # Exact breakeven points, including those outside the plotted range
+            for breakeven_point in data['breakeven_points']:
+                ax.plot([breakeven_point], [0], 'bo', label=f'BEP: {breakeven_point:.2f}', alpha=0.3)
+
+        with span(self._fill_span):
+            profit = profit_mask(payoffs, data['zero_is_profit'])
+            # Loss Area
+            ax.fill_between(underlying_range, payoffs, where=(payoffs <= 0), color=self.loss_color, alpha=0.2, label='Profit Area')
+
+            # Profit Area
+            ax.fill_between(underlying_range, payoffs, where=profit, color=self.profit_color, alpha=0.2, label='Loss Area')
+        ax.legend()
+        return finish_figure(fig, interactive, fname, format)
@@ -0,0 +1,314 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from batch_strategies import BatchStrategies
+from leg_store import payoff_kernel
+
+# Each shape is a list of legs (strike slot, is_long, is_call). Slots take strictly
+# increasing strike indices from the chain; legs sharing a slot share the strike.
+SHAPES = {
+    'bull_call_spread': [(0, True, True), (1, False, True)],
+    'bear_call_spread': [(0, False, True), (1, True, True)],
+    'bull_put_spread': [(0, True, False), (1, False, False)],
+    'bear_put_spread': [(0, False, False), (1, True, False)],
+    'long_straddle': [(0, True, False), (0, True, True)],
+    'short_straddle': [(0, False, False), (0, False, True)],
+    'long_strangle': [(0, True, False), (1, True, True)],
+    'short_strangle': [(0, False, False), (1, False, True)],
+    'long_call_butterfly': [(0, True, True), (1, False, True), (1, False, True), (2, True, True)],
+    'long_put_butterfly': [(0, True, False), (1, False, False), (1, False, False), (2, True, False)],
+    'iron_condor': [(0, True, False), (1, False, False), (2, False, True), (3, True, True)],
+    'long_call_condor': [(0, True, True), (1, False, True), (2, False, True), (3, True, True)],
+}
+
+# Butterflies use equally spaced strike indices
+SYMMETRIC = {'long_call_butterfly', 'long_put_butterfly'}
+
+def _reward_risk(batch, max_loss, max_profit):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = max_profit / np.maximum(-max_loss, 1e-12)
+    return np.where(np.isneginf(max_loss), -np.inf, ratio)
+
+def _breakeven_width(batch, max_loss, max_profit):
+    values, offsets = batch.breakevens()
+    counts = np.diff(offsets)
+    width = np.zeros(len(batch))
+    has_two = counts >= 2
+    width[has_two] = values[offsets[1:][has_two] - 1] - values[offsets[:-1][has_two]]
+    return width
+
+# Objectives map a batch and its exact max loss/profit to a score; higher ranks first
+OBJECTIVES = {
+    'max_loss': lambda batch, max_loss, max_profit: max_loss,
+    'reward_risk': _reward_risk,
+    'breakeven_width': _breakeven_width,
+}
+
+def _suffix(values, ufunc):
+    return ufunc.accumulate(values[::-1])[::-1]
+
+class OptionChain():
+    def __init__(self, S, strikes, call_premiums, put_premiums):
+        order = np.argsort(strikes)
+        self.S = float(S)
+        self.strikes = np.asarray(strikes, dtype=float)[order]
+        self.call_premiums = np.asarray(call_premiums, dtype=float)[order]
+        self.put_premiums = np.asarray(put_premiums, dtype=float)[order]
+        if not (self.strikes.size == self.call_premiums.size == self.put_premiums.size):
+            raise ValueError("Strikes and premiums must have the same length.")
+
+        # Suffix extremes over strikes >= K[q] bound any leg not yet placed
+        self.call_max = _suffix(self.call_premiums, np.maximum)
+        self.call_min = _suffix(self.call_premiums, np.minimum)
+        self.put_max = _suffix(self.put_premiums, np.maximum)
+        self.put_min = _suffix(self.put_premiums, np.minimum)
+        self.put_value_max = _suffix(self.strikes - self.put_premiums, np.maximum)
+        self.put_value_min = _suffix(self.strikes - self.put_premiums, np.minimum)
+        self.call_value_max = _suffix(self.strikes + self.call_premiums, np.maximum)
+        self.call_value_min = _suffix(self.strikes + self.call_premiums, np.minimum)
+
+    def __len__(self):
+        return self.strikes.size
+
+    def premiums(self, is_call, index):
+        return np.where(is_call, self.call_premiums[index], self.put_premiums[index])
+
+class _TopCandidates():
+    def __init__(self, top):
+        self.top = top
+        self.score = np.empty(0)
+        self.shape = np.empty(0, dtype=np.int64)
+        self.index = np.empty((0, 4), dtype=np.int64)
+
+    def threshold(self):
+        if self.score.size < self.top:
+            return -np.inf
+        return self.score.min()
+
+    def add(self, score, shape, index):
+        padded = np.full((index.shape[0], 4), -1, dtype=np.int64)
+        padded[:, :index.shape[1]] = index
+        self.score = np.concatenate((self.score, score))
+        self.shape = np.concatenate((self.shape, np.full(score.size, shape, dtype=np.int64)))
+        self.index = np.concatenate((self.index, padded))
+        if self.score.size > self.top:
+            best = np.argpartition(-self.score, self.top - 1)[:self.top]
+            self.score = self.score[best]
+            self.shape = self.shape[best]
+            self.index = self.index[best]
+
+class StrategyScanner():
+    # Enumerates shapes over an option chain with bound-based pruning. A partial position
+    # (the first slots placed) is discarded when an analytic bound shows that no completion
+    # can satisfy max_loss_limit / max_net_debit, or beat the current top list on max loss
+    # or reward/risk.
+    def __init__(self, chain, shapes=None, objective='reward_risk', max_net_debit=None, max_loss_limit=None,
+                 max_wing=None, top=20, chunk_size=200000):
+        self.chain = chain
+        self.shapes = list(SHAPES) if shapes is None else list(shapes)
+        for shape in self.shapes:
+            if shape not in SHAPES:
+                raise ValueError(f"Unknown strategy shape: {shape}")
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}")
+        self.objective = objective
+        self.max_net_debit = max_net_debit
+        self.max_loss_limit = max_loss_limit
+        self.max_wing = max_wing
+        self.top = top
+        self.chunk_size = chunk_size
+
+    def scan(self, processes=None):
+        # Split the first strike index across worker processes, then merge the top lists
+        first_indices = np.arange(len(self.chain))
+        if processes is None or processes <= 1:
+            top = self._scan_first(first_indices)
+        else:
+            tasks = [first_indices[worker::processes] for worker in range(processes)]
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                results = list(pool.map(self._scan_first, tasks))
+            top = _TopCandidates(self.top)
+            for result in results:
+                for shape in np.unique(result.shape):
+                    picked = result.shape == shape
+                    top.add(result.score[picked], shape, result.index[picked])
+        return self._report(top)
+
+    def _scan_first(self, first_indices):
+        top = _TopCandidates(self.top)
+        for shape_id, name in enumerate(SHAPES):
+            if name in self.shapes:
+                self._expand(top, shape_id, name, first_indices[:, None])
+        return top
+
+    def _children(self, name, partial):
+        # Next strike index for every partial tuple, respecting max_wing and butterfly symmetry
+        n = len(self.chain)
+        last = partial[:, -1]
+        if name in SYMMETRIC and partial.shape[1] == 2:
+            child = 2 * partial[:, 1] - partial[:, 0]
+            keep = child < n
+            return np.column_stack((partial[keep], child[keep]))
+        stop = np.full(last.size, n - 1) if self.max_wing is None else np.minimum(last + self.max_wing, n - 1)
+        counts = np.maximum(stop - last, 0)
+        rows = np.repeat(np.arange(last.size), counts)
+        step = np.arange(rows.size) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        return np.column_stack((partial[rows], last[rows] + step))
+
+    def _expand(self, top, shape_id, name, partial):
+        legs = SHAPES[name]
+        n_slots = max(slot for slot, is_long, is_call in legs) + 1
+        partial = partial[self._feasible(top, name, partial)]
+        if partial.shape[1] == n_slots:
+            self._evaluate(top, shape_id, name, partial)
+            return
+        # Depth-first over chunks keeps memory flat and lets the top list tighten early
+        width = len(self.chain) if self.max_wing is None else self.max_wing
+        step = max(self.chunk_size // max(width, 1), 1)
+        for start in range(0, partial.shape[0], step):
+            children = self._children(name, partial[start:start + step])
+            if children.size:
+                self._expand(top, shape_id, name, children)
+
+    def _feasible(self, top, name, partial):
+        keep = np.ones(partial.shape[0], dtype=bool)
+
+        loss_limit = -np.inf if self.max_loss_limit is None else -self.max_loss_limit
+        if self.objective == 'max_loss':
+            loss_limit = max(loss_limit, top.threshold())
+        check_loss = loss_limit > -np.inf
+        check_debit = self.max_net_debit is not None
+        check_score = self.objective == 'reward_risk' and top.threshold() > -np.inf
+        if not (check_loss or check_debit or check_score):
+            return keep
+
+        payoff_bound, debit_bound, last_slope = self._bounds(name, partial)
+        # The bound is piecewise linear, so its extremes over x >= 0 sit at a knot or at infinity
+        loss_bound = np.where(last_slope < 0, -np.inf, payoff_bound.min(axis=1))
+        if check_loss:
+            keep &= loss_bound >= loss_limit
+        if check_debit:
+            keep &= debit_bound <= self.max_net_debit
+        if check_score:
+            profit_bound = np.where(last_slope > 0, np.inf, payoff_bound.max(axis=1))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                score_bound = np.where(profit_bound > 0, profit_bound / np.maximum(-loss_bound, 1e-12), 0.0)
+            score_bound[last_slope < 0] = -np.inf
+            keep &= score_bound >= top.threshold()
+        return keep
+
+    def _bounds(self, name, partial):
+        # Upper bound on the final payoff of every completion of the partial tuples, taken at
+        # the knots of the bound itself (rows x knots), plus an upper bound on the net debit
+        # and the payoff slope right of the highest strike. A leg not yet placed sits at some
+        # strike index >= q, so its payoff is bounded by the suffix extremes from q on.
+        chain = self.chain
+        legs = SHAPES[name]
+        m = partial.shape[1]
+        last = partial[:, -1]
+        placed = [chain.strikes[partial[:, slot]] for slot in range(m)]
+        knots = [np.zeros(last.size)] + placed
+        pending = []
+        for slot, is_long, is_call in legs:
+            if slot >= m:
+                q = np.minimum(last + slot - m + 1, len(chain) - 1)
+                if is_call and is_long:
+                    # max(x - K, 0) - P <= max(x - min(K + P), -min(P))
+                    pending.append((is_long, is_call, chain.call_value_min[q], chain.call_min[q]))
+                    knots.append(chain.call_value_min[q] - chain.call_min[q])
+                elif is_call:
+                    # P - max(x - K, 0) <= min(max(P), max(K + P) - x)
+                    pending.append((is_long, is_call, chain.call_value_max[q], chain.call_max[q]))
+                    knots.append(chain.call_value_max[q] - chain.call_max[q])
+                elif is_long:
+                    # max(K - x, 0) - P <= max(max(K - P) - x, -min(P))
+                    pending.append((is_long, is_call, chain.put_value_max[q], chain.put_min[q]))
+                    knots.append(chain.put_value_max[q] + chain.put_min[q])
+                else:
+                    # P - max(K - x, 0) <= min(max(P), x - min(K - P))
+                    pending.append((is_long, is_call, chain.put_value_min[q], chain.put_max[q]))
+                    knots.append(chain.put_value_min[q] + chain.put_max[q])
+        x = np.maximum(np.column_stack(knots), 0.0)
+
+        payoff_bound = np.zeros_like(x)
+        debit_bound = np.zeros(last.size)
+        last_slope = 0
+        for slot, is_long, is_call in legs:
+            sign = 1.0 if is_long else -1.0
+            if is_call:
+                last_slope += int(sign)
+            if slot < m:
+                index = partial[:, slot]
+                premium = chain.premiums(is_call, index)
+                payoff_bound += payoff_kernel(x, chain.strikes[index, None], premium[:, None], is_long, is_call)
+                debit_bound += sign * premium
+        for is_long, is_call, value, premium in pending:
+            value, premium = value[:, None], premium[:, None]
+            if is_call and is_long:
+                payoff_bound += np.maximum(x - value, -premium)
+            elif is_call:
+                payoff_bound += np.minimum(premium, value - x)
+            elif is_long:
+                payoff_bound += np.maximum(value - x, -premium)
+            else:
+                payoff_bound += np.minimum(premium, x - value)
+            debit_bound += premium[:, 0] if is_long else -premium[:, 0]
+        return payoff_bound, debit_bound, np.full(last.size, last_slope)
+
+    def _batch(self, name, index):
+        legs = SHAPES[name]
+        slots = np.array([slot for slot, is_long, is_call in legs])
+        is_long = np.array([is_long for slot, is_long, is_call in legs])
+        is_call = np.array([is_call for slot, is_long, is_call in legs])
+        strike_index = index[:, slots]
+        premium = self.chain.premiums(is_call, strike_index)
+        batch = BatchStrategies.from_padded(self.chain.S, self.chain.strikes[strike_index], premium,
+                                            is_long, is_call)
+        net_debit = np.where(is_long, premium, -premium).sum(axis=1)
+        return batch, net_debit
+
+    def _evaluate(self, top, shape_id, name, index):
+        if index.shape[0] == 0:
+            return
+        batch, net_debit = self._batch(name, index)
+        max_loss = batch.max_loss()
+        max_profit = batch.max_profit()
+        keep = np.ones(len(batch), dtype=bool)
+        if self.max_net_debit is not None:
+            keep &= net_debit <= self.max_net_debit
+        if self.max_loss_limit is not None:
+            keep &= max_loss >= -self.max_loss_limit
+        score = OBJECTIVES[self.objective](batch, max_loss, max_profit)
+        keep &= ~np.isnan(score)
+        top.add(score[keep], shape_id, index[keep])
+
+    def _report(self, top):
+        names = list(SHAPES)
+        results = []
+        for i in np.argsort(-top.score, kind='stable'):
+            name = names[top.shape[i]]
+            index = top.index[i][top.index[i] >= 0][None, :]
+            batch, net_debit = self._batch(name, index)
+            results.append({
+                'shape': name,
+                'legs': [(self.chain.S, float(K), float(P), 'long' if is_long else 'short',
+                          'call' if is_call else 'put')
+                         for K, P, is_long, is_call in zip(batch.K, batch.P, batch.is_long, batch.is_call)],
+                'score': float(top.score[i]),
+                'max_loss': float(batch.max_loss()[0]),
+                'max_profit': float(batch.max_profit()[0]),
+                'net_debit': float(net_debit[0]),
+                'breakevens': batch.breakeven_points()[0],
+            })
+        return results
+
+if __name__ == '__main__':
+    # Synthetic 200-strike chain priced with Black-Scholes
+    from black_scholes import BlackScholes
+    S = 4000
+    strikes = np.arange(3000, 5000, 10.0)
+    calls = BlackScholes(strikes, 0.1, 0.2, 0.01, True).value(S)
+    puts = BlackScholes(strikes, 0.1, 0.2, 0.01, False).value(S)
+    scanner = StrategyScanner(OptionChain(S, strikes, calls, puts), objective='reward_risk',
+                              max_loss_limit=100, max_wing=20, top=5)
+    for result in scanner.scan(processes=4):
+        print(result['shape'], result['score'], result['legs'])
@@ -0,0 +1,29 @@
+import numpy as np
+from batch_strategies import BatchStrategies
+from order_options import OrderOptions
+
+def random_strategies(rng, n):
+    return [[(100.0, float(rng.integers(16, 24) * 5), rng.integers(1, 200) / 20.0,
+              str(rng.choice(['long', 'short'])), str(rng.choice(['call', 'put'])))
+             for _ in range(rng.integers(1, 6))] for _ in range(n)]
+
+def test_breakeven_on_a_strike_is_kept():
+    legs = [(90, 100, 8.25, 'short', 'call'), (90, 85, 6.15, 'short', 'put'), (90, 100, 0.2, 'short', 'call'),
+            (90, 80, 5.4, 'short', 'call')]
+    batch = BatchStrategies.from_strategies([legs, legs[:2]])
+    assert np.allclose(batch.breakeven_points()[0], [65.0, 100.0])
+
+def test_matches_order_options():
+    strategies = random_strategies(np.random.default_rng(1), 500)
+    batch = BatchStrategies.from_strategies(strategies)
+    x = np.linspace(0, 200, 401)
+    payoffs = batch.payoff_matrix(x)
+    for legs, breakeven_points, payoff, price, low, high in zip(strategies, batch.breakeven_points(), payoffs,
+                                                               batch.calculate_price(), batch.max_loss(),
+                                                               batch.max_profit()):
+        order_options = OrderOptions(*legs)
+        expected = order_options.breakeven_points()
+        assert len(breakeven_points) == len(expected) and np.allclose(breakeven_points, expected)
+        assert np.allclose(payoff, order_options.payoff_model().evaluate(x))
+        assert np.isclose(price, order_options.total_prices())
+        assert np.isclose(low, order_options.max_loss()) and np.isclose(high, order_options.max_profit())
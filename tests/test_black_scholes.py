@@ -0,0 +1,26 @@
+import numpy as np
+from black_scholes import BlackScholes
+
+def test_value_follows_in_place_spot_changes():
+    engine = BlackScholes(np.array([90.0, 100.0, 110.0]), 0.5, 0.2, is_call=True)
+    spots = np.array([100.0, 100.0, 100.0])
+    engine.value(spots)
+    spots *= 1.5
+    assert np.allclose(engine.value(spots), BlackScholes([90.0, 100.0, 110.0], 0.5, 0.2).value([150.0] * 3))
+
+def test_greeks_match_finite_differences():
+    K = np.array([90.0, 100.0, 110.0, 100.0])
+    is_call = np.array([True, True, False, False])
+    engine = BlackScholes(K, 0.5, 0.25, 0.03, is_call)
+    S = np.array([100.0, 95.0, 105.0, 100.0])
+    greeks = engine.greeks(S)
+    h = 1e-4
+    assert np.allclose(greeks['value'], engine.value(S))
+    assert np.allclose(greeks['delta'], (engine.value(S + h) - engine.value(S - h)) / (2 * h), atol=1e-6)
+    assert np.allclose(greeks['vega'], (BlackScholes(K, 0.5, 0.25 + h, 0.03, is_call).value(S)
+                                        - BlackScholes(K, 0.5, 0.25 - h, 0.03, is_call).value(S)) / (2 * h),
+                       atol=1e-5)
+    # Put-call parity
+    call = BlackScholes(100.0, 0.5, 0.25, 0.03, True).value(100.0)
+    put = BlackScholes(100.0, 0.5, 0.25, 0.03, False).value(100.0)
+    assert np.isclose(call - put, 100.0 - 100.0 * np.exp(-0.03 * 0.5))
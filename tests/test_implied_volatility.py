@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from black_scholes import BlackScholes
+from implied_volatility import implied_volatility, BISECTED, CONVERGED, ILL_CONDITIONED, OUT_OF_BOUNDS
+from order_options import OrderOptions
+
+def test_recovers_model_volatility():
+    K = np.array([3600.0, 3800.0, 4000.0, 4200.0, 4400.0])
+    is_call = np.array([True, False, True, False, True])
+    sigma = np.array([0.15, 0.2, 0.25, 0.3, 0.35])
+    prices = BlackScholes(K, 0.25, sigma, 0.01, is_call).value(4000.0)
+    solved, status = implied_volatility(prices, 4000.0, K, 0.25, 0.01, is_call)
+    assert np.all(status == CONVERGED)
+    assert np.allclose(solved, sigma, atol=1e-6)
+
+def test_converged_status_means_sigma_is_within_vol_tol():
+    rng = np.random.default_rng(1)
+    n = 50000
+    K = rng.uniform(2000, 6000, n)
+    T = rng.uniform(0.01, 2, n)
+    sigma = rng.uniform(0.05, 1.0, n)
+    is_call = rng.random(n) < 0.5
+    prices = BlackScholes(K, T, sigma, 0.01, is_call).value(4000.0)
+    solved, status = implied_volatility(prices, 4000.0, K, T, 0.01, is_call, vol_tol=1e-6)
+    solved_ok = np.isin(status, [CONVERGED, BISECTED])
+    assert np.all(np.abs(solved[solved_ok] - sigma[solved_ok]) < 1e-5)
+    # Deep in- or out-of-the-money quotes with near-zero vega are flagged, not passed off as converged
+    assert np.any(status == ILL_CONDITIONED)
+    assert np.all(np.isfinite(solved[status == ILL_CONDITIONED]))
+
+def test_out_of_bounds_leg_needs_a_fallback():
+    # The long 3800 call premium (120) is below its intrinsic value (200)
+    order_options = OrderOptions((4000, 4200, 90, 'short', 'call'), (4000, 3800, 120, 'long', 'call'))
+    sigma, status = order_options.implied_volatility(0.1)
+    assert status[1] == OUT_OF_BOUNDS and np.isnan(sigma[1])
+    with pytest.raises(ValueError):
+        order_options.model_pnl(np.linspace(3500, 4500, 11), 0.1, sigma)
+    sigma, status = order_options.implied_volatility(0.1, fallback=0.2)
+    assert sigma[1] == 0.2
+    assert np.all(np.isfinite(order_options.model_pnl(np.linspace(3500, 4500, 11), 0.1, sigma)))
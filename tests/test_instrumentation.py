@@ -0,0 +1,29 @@
+import instrumentation
+from instrumentation import span
+
+def test_trace_events_are_bounded_but_totals_are_not():
+    instrumentation.reset()
+    instrumentation.enable(max_events=10)
+    try:
+        for _ in range(1000):
+            with span('work'):
+                pass
+        events = instrumentation.trace_events()
+        summary, = instrumentation.summary()
+    finally:
+        instrumentation.enable(False, max_events=100000)
+        instrumentation.reset()
+    assert len(events) == 10
+    assert summary['span'] == 'work' and summary['calls'] == 1000
+
+def test_max_events_zero_keeps_only_the_summary():
+    instrumentation.reset()
+    instrumentation.enable(max_events=0)
+    try:
+        with span('work'):
+            pass
+        assert instrumentation.trace_events() == []
+        assert instrumentation.summary()[0]['calls'] == 1
+    finally:
+        instrumentation.enable(False, max_events=100000)
+        instrumentation.reset()
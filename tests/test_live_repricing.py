@@ -0,0 +1,62 @@
+import asyncio
+import numpy as np
+import pytest
+from live_repricing import LiveRepricer, ReplaySource
+from order_options import OrderOptions
+
+def _books(seed=0, n=50):
+    rng = np.random.default_rng(seed)
+    return {symbol: OrderOptions.from_arrays(4000, rng.uniform(3500, 4500, n).round(), rng.uniform(10, 200, n),
+                                             rng.choice(['long', 'short'], n), rng.choice(['call', 'put'], n))
+            for symbol in ('TXO', 'SPX', 'NDX')}
+
+@pytest.fixture
+def ticks(tmp_path):
+    rng = np.random.default_rng(1)
+    symbols = rng.choice(['TXO', 'SPX', 'NDX'], 200)
+    spots = (4000 + rng.normal(0, 20, 200).cumsum()).round(2)
+    path = tmp_path / 'ticks.csv'
+    path.write_text('symbol,spot\n' + ''.join(f'{symbol},{spot}\n' for symbol, spot in zip(symbols, spots)))
+    return path, list(zip(symbols.tolist(), spots.tolist()))
+
+@pytest.mark.parametrize('max_queue', [1, 4, 1000])
+def test_total_tracks_every_book_and_bursts_are_coalesced(ticks, max_queue):
+    path, expected = ticks
+    books = _books()
+    updates = []
+
+    async def on_update(update):
+        updates.append(update)
+
+    repricer = LiveRepricer(books, max_queue=max_queue, on_update=on_update)
+    asyncio.run(repricer.run(ReplaySource(path)))
+    metrics = repricer.metrics
+
+    assert metrics.ticks_received == len(expected)
+    assert np.isclose(repricer.total, sum(book.total_prices() for book in books.values()))
+    last = dict(expected)
+    for symbol, book in books.items():
+        assert np.all(book.legs.S == last[symbol])
+        assert np.isclose(repricer.totals[symbol], book.total_prices())
+
+    # Every tick either reached a reprice or was coalesced into a later one in its burst
+    assert sum(len(update['changed']) for update in updates) + metrics.ticks_coalesced == len(expected)
+    assert metrics.updates_published == len(updates)
+    assert metrics.legs_repriced == sum(len(books[symbol].legs) for update in updates for symbol in update['changed'])
+    # The replay never yields to the loop, so the feed fills the queue before each burst is drained
+    assert metrics.queue_high_water == min(max_queue, len(expected))
+    if max_queue == 1:
+        assert metrics.ticks_coalesced == 0
+    else:
+        assert metrics.ticks_coalesced > 0
+
+def test_unknown_symbols_are_skipped(tmp_path):
+    path = tmp_path / 'ticks.csv'
+    path.write_text('1.0,TXO,4010\n2.0,XXX,1\n3.0,SPX,3990\n')
+    books = _books()
+    repricer = LiveRepricer(books)
+    asyncio.run(repricer.run(ReplaySource(path)))
+    assert repricer.metrics.ticks_received == 3
+    assert set(repricer.totals) == set(books)
+    assert np.all(books['TXO'].legs.S == 4010) and np.all(books['NDX'].legs.S == 4000)
+    assert np.isclose(repricer.total, sum(book.total_prices() for book in books.values()))
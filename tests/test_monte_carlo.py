@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from monte_carlo import LognormalSampler, MonteCarloEngine
+from order_options import OrderOptions
+
+POSITIONS = {
+    # Capped on both sides: point masses at max loss and max profit
+    'bull_call_spread': OrderOptions((4000, 3900, 150, 'long', 'call'), (4000, 4100, 60, 'short', 'call')),
+    # Unbounded profit: histogram edges come from the pilot sample
+    'long_call': OrderOptions((4000, 4000, 100, 'long', 'call')),
+    # Unbounded loss above the call strike: the low edge comes from the pilot sample
+    'short_strangle': OrderOptions((4000, 3800, 40, 'short', 'put'), (4000, 4200, 45, 'short', 'call')),
+}
+
+def _engine(name, chunk_size=100000):
+    return MonteCarloEngine(POSITIONS[name], T=0.25, sigma=0.2, r=0.01, chunk_size=chunk_size)
+
+@pytest.mark.parametrize('name', list(POSITIONS))
+def test_results_do_not_depend_on_worker_count(name):
+    serial = _engine(name).run(400000, seed=7).summary()
+    parallel = _engine(name).run(400000, seed=7, processes=2).summary()
+    assert serial == parallel
+
+@pytest.mark.parametrize('name', list(POSITIONS))
+def test_var_and_cvar_match_a_direct_sample(name):
+    engine = _engine(name)
+    result = engine.run(10 ** 6, seed=3)
+    edges, counts = result.histogram()
+    width = edges[1] - edges[0]
+    pnl = POSITIONS[name].payoff_model().evaluate(
+        LognormalSampler(4000, 0.25, 0.2, 0.01)(np.random.default_rng(11), 10 ** 6))
+    for level in (0.9, 0.95, 0.99):
+        quantile = np.quantile(pnl, 1 - level)
+        tail = pnl[pnl <= quantile]
+        # One histogram bin plus sampling noise
+        tolerance = width + 0.02 * max(abs(quantile), 1.0)
+        assert result.var(level) == pytest.approx(-quantile, abs=tolerance)
+        assert result.cvar(level) == pytest.approx(-tail.mean(), abs=tolerance)
+        assert result.cvar(level) >= result.var(level) - width
+
+def test_stops_early_once_target_se_is_reached():
+    engine = _engine('bull_call_spread', chunk_size=10000)
+    result = engine.run(10 ** 7, seed=5, target_se=0.5)
+    assert result.converged and result.std_error <= 0.5
+    assert result.n_paths < 10 ** 7 and result.n_paths % 10000 == 0
+    # One chunk fewer would not have reached the target
+    assert engine.run(result.n_paths - 10000, seed=5).std_error > 0.5 or result.n_paths == 10000
+    # Early stopping lands on the same chunk however many workers run
+    assert engine.run(10 ** 7, seed=5, target_se=0.5, processes=3).summary() == result.summary()
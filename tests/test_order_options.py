@@ -0,0 +1,20 @@
+import pickle
+import numpy as np
+from order_options import OrderOptions
+from payoff_cache import PayoffCache, default_cache
+
+def test_pickle_leaves_the_cache_and_curve_behind():
+    cache = PayoffCache()
+    order_options = OrderOptions((4000, 4000, 100, 'long', 'call'), cache=cache, grid=(2000, 6000, 10**5))
+    x, payoffs = order_options.payoff_curve()
+    assert len(cache) == 1
+    data = pickle.dumps(order_options)
+    assert len(data) < 10**4
+    copy = pickle.loads(data)
+    assert copy.cache is default_cache and order_options.cache is cache
+    assert np.array_equal(copy.payoff_curve()[1], payoffs)
+
+def test_default_cache_is_not_stored_on_instances():
+    order_options = OrderOptions((4000, 4000, 100, 'long', 'call'))
+    assert order_options.cache is default_cache
+    assert default_cache not in vars(order_options).values()
@@ -0,0 +1,25 @@
+import numpy as np
+from order_options import OrderOptions
+from payoff_cache import PayoffCache
+
+def test_bounded_by_bytes():
+    cache = PayoffCache(maxsize=1024, max_bytes=10 * 8000)
+    for key in range(40):
+        cache.get(key, lambda: np.zeros(1000))
+    assert len(cache) == 10 and cache.nbytes == 10 * 8000
+    assert cache.lookup(39) is not None and cache.lookup(0) is None
+
+def test_oversized_values_are_not_kept():
+    cache = PayoffCache(max_bytes=1000)
+    value = cache.get('big', lambda: np.zeros(1000))
+    assert value.size == 1000 and len(cache) == 0 and cache.nbytes == 0
+
+def test_incremental_curve_on_a_large_grid_stays_within_budget():
+    cache = PayoffCache(max_bytes=32 * 2**20)
+    order_options = OrderOptions((4000, 4000, 100, 'long', 'call'), cache=cache, grid=(2000, 6000, 10**6))
+    order_options.payoff_curve()
+    for K in range(3000, 5000, 50):
+        order_options.add_leg(4000, K, 10, 'short', 'put')
+    assert cache.nbytes <= 32 * 2**20
+    x, payoffs = order_options.payoff_curve()
+    assert np.allclose(payoffs[::1000], order_options.payoff_model().evaluate(x[::1000]))
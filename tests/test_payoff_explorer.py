@@ -0,0 +1,8 @@
+from order_options import OrderOptions
+from payoff_explorer import PayoffExplorer
+
+def test_single_leg_slider_is_disabled_and_clamped():
+    explorer = PayoffExplorer(OrderOptions((4000, 4000, 100, 'long', 'call')))
+    assert not explorer.leg_slider.get_active()
+    explorer.leg_slider.set_val(1)
+    assert explorer.leg == 0 and explorer.leg_slider.val == 0
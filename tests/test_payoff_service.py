@@ -0,0 +1,27 @@
+import asyncio
+import json
+import pytest
+from payoff_service import PayoffService, parse_request
+
+LEG = [4000, 4100, 90, 'long', 'call']
+
+@pytest.mark.parametrize('payload', [
+    [LEG],
+    {'legs': [[4000, float('nan'), 90, 'long', 'call']]},
+    {'legs': [[4000, 4100, float('inf'), 'long', 'call']]},
+    {'legs': [LEG], 'grid': [float('-inf'), 5000, 100]},
+    {'legs': [LEG], 'grid': [3000, float('nan'), 100]},
+    {'legs': [LEG], 'grid': [3000, 5000]},
+    {'legs': [LEG], 'grid': 3000},
+])
+def test_parse_request_rejects_malformed_payloads(payload):
+    with pytest.raises(ValueError):
+        parse_request(payload)
+
+def test_route_returns_client_errors_without_exception_text():
+    service = PayoffService()
+    for body in (b'[1, 2]', b'{"legs": [[4000, NaN, 90, "long", "call"]]}', b'{"legs": [[4000, 4100, 90, "long", "call"]],'
+                 b' "grid": {"low": 1}}', b'not json'):
+        status, response = asyncio.run(service._route('POST', '/evaluate', body))
+        assert status == 400
+        assert ' must ' in json.loads(response)['error']
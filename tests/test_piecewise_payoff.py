@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from order_options import OrderOptions
+from piecewise_payoff import PiecewiseLinearPayoff
+
+def test_breakeven_on_a_strike_is_kept():
+    # The payoff crosses zero exactly at K=100, which rounds outside both adjacent segments
+    order_options = OrderOptions((90, 100, 8.25, 'short', 'call'), (90, 85, 6.15, 'short', 'put'),
+                                 (90, 100, 0.2, 'short', 'call'), (90, 80, 5.4, 'short', 'call'))
+    assert np.allclose(order_options.breakeven_points(), [65.0, 100.0])
+
+def test_breakeven_at_zero_is_kept():
+    model = PiecewiseLinearPayoff([100.0], [100.0], [False], [False])
+    assert np.allclose(model.breakeven_points(), [0.0])
+
+def test_breakevens_match_a_sign_change_scan():
+    rng = np.random.default_rng(0)
+    x = np.arange(0, 20001) / 100.0
+    for _ in range(200):
+        n = rng.integers(1, 5)
+        model = PiecewiseLinearPayoff(rng.integers(80, 120, n) * 1.0, rng.integers(1, 200, n) / 20.0,
+                                      rng.random(n) < 0.5, rng.random(n) < 0.5)
+        values = model.evaluate(x)
+        sign = np.sign(np.round(values, 9))
+        crossings = np.flatnonzero(sign[:-1] * sign[1:] < 0)
+        for i in crossings:
+            assert np.any((model.breakeven_points() >= x[i] - 1e-9) & (model.breakeven_points() <= x[i + 1] + 1e-9))
+
+def test_evaluate_matches_leg_payoffs():
+    order_options = OrderOptions((4000, 3600, 150, 'long', 'put'), (4000, 3800, 120, 'long', 'call'),
+                                 (4000, 4200, 60, 'short', 'call'))
+    x = np.linspace(0, 8000, 801)
+    expected = sum(option.calculate_payoff(x) for option in order_options.options)
+    assert np.allclose(order_options.payoff_model().evaluate(x), expected)
+    assert order_options.max_loss() == -210.0
+
+def test_leg_columns_are_read_only():
+    order_options = OrderOptions((4000, 3900, 10, 'long', 'call'), (4000, 4100, 20, 'short', 'call'))
+    order_options.payoff_curve()
+    with pytest.raises(ValueError):
+        order_options.legs.P[1] = 10
+    # Edits through update_leg keep the cached curve and the breakevens in step
+    order_options.update_leg(1, P=10)
+    x, payoffs = order_options.payoff_curve()
+    assert np.allclose(payoffs, order_options.payoff_model().evaluate(x))
@@ -0,0 +1,15 @@
+import numpy as np
+from portfolio import Portfolio
+
+def test_book_edits_do_not_write_through_to_the_portfolio():
+    portfolio = Portfolio(['A', 'A', 'B'], [100, 100, 50], [100, 110, 50], [5, 2, 3], ['long', 'short', 'long'],
+                          ['call', 'call', 'put'])
+    strikes = portfolio.batch.K.copy()
+    breakevens = portfolio.breakeven_points()
+    book = portfolio.book('A')
+    book.update_leg(0, K=120)
+    book.set_spot(130)
+    assert book.legs.K[0] == 120
+    assert np.array_equal(portfolio.batch.K, strikes)
+    assert np.array_equal(portfolio.spots(), [100, 50])
+    assert np.allclose(portfolio.breakeven_points()['A'], breakevens['A'])
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from leg_store import LegStore
+from order_options import OrderOptions
+from position_io import LEG_DTYPE, iter_strategy_batches, load_legs, load_order_options, main, save_npy
+
+# Strategies of 1, 3, 2 and 1 legs, so small chunks split them in different places
+ROWS = [
+    (1, 4000, 4000, 100, 'long', 'call'),
+    (2, 4000, 3900, 60, 'long', 'put'),
+    (2, 4000, 4000, 110, 'short', 'put'),
+    (2, 4000, 4100, 70, 'long', 'call'),
+    (3, 4000, 3800, 30, 'short', 'put'),
+    (3, 4000, 4200, 35, 'short', 'call'),
+    (4, 4000, 4050, 80, 'short', 'call'),
+]
+
+@pytest.fixture
+def strategies_csv(tmp_path):
+    path = tmp_path / 'strategies.csv'
+    lines = ['strategy,S,K,P,LorS,option_type'] + [','.join(map(str, row)) for row in ROWS]
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+def _expected():
+    result = {}
+    for strategy in sorted({row[0] for row in ROWS}):
+        legs = [row[1:] for row in ROWS if row[0] == strategy]
+        order_options = OrderOptions(*legs)
+        result[strategy] = (order_options.total_prices(), order_options.breakeven_points())
+    return result
+
+def _collect(path, chunk_size):
+    result = {}
+    for batch in iter_strategy_batches(path, chunk_size):
+        for strategy, price, breakeven_points in zip(batch.ids, batch.calculate_price(), batch.breakeven_points()):
+            assert strategy not in result
+            result[int(strategy)] = (price, breakeven_points)
+    return result
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 100])
+def test_strategies_split_across_chunks_are_reassembled(strategies_csv, chunk_size):
+    result = _collect(strategies_csv, chunk_size)
+    expected = _expected()
+    assert list(result) == list(expected)
+    for strategy, (price, breakeven_points) in expected.items():
+        assert np.isclose(result[strategy][0], price)
+        assert np.allclose(result[strategy][1], breakeven_points)
+
+@pytest.mark.parametrize('chunk_size', [1, 2])
+def test_npy_strategy_batches_match_csv(strategies_csv, tmp_path, chunk_size):
+    dtype = np.dtype([('strategy', 'i8')] + LEG_DTYPE.descr)
+    records = np.array([(row[0], row[1], row[2], row[3], row[4] == 'long', row[5] == 'call') for row in ROWS],
+                       dtype=dtype)
+    path = tmp_path / 'strategies.npy'
+    np.save(path, records)
+    result, expected = _collect(path, chunk_size), _collect(strategies_csv, 100)
+    assert list(result) == list(expected)
+    for strategy in expected:
+        assert np.isclose(result[strategy][0], expected[strategy][0])
+
+def test_save_npy_load_legs_round_trip(tmp_path):
+    legs = LegStore.from_arrays(4000, [3900, 4000, 4100], [60, 100, 70], ['long', 'short', 'long'],
+                                ['put', 'call', 'call'])
+    path = tmp_path / 'legs.npy'
+    save_npy(legs, path)
+    loaded = load_legs(path)
+    assert isinstance(loaded._K, np.memmap)
+    for name in LEG_DTYPE.names:
+        assert np.array_equal(getattr(loaded, name), getattr(legs, name))
+    # Edits copy the memory-mapped columns instead of writing to the file
+    order_options = load_order_options(path)
+    order_options.update_leg(0, K=3800)
+    order_options.set_spot(4100)
+    assert order_options.legs.K[0] == 3800 and np.all(order_options.legs.S == 4100)
+    assert np.array_equal(np.load(path)['K'], legs.K) and np.all(np.load(path)['S'] == 4000)
+
+def test_main_reports_position_and_strategies(strategies_csv, capsys):
+    main([str(strategies_csv), '--prices'])
+    output = capsys.readouterr().out.splitlines()
+    order_options = OrderOptions(*[row[1:] for row in ROWS])
+    assert output[0].startswith('Option Prices:')
+    assert output[1] == f'Total Price: {order_options.total_prices()}'
+    assert output[2].startswith('Breakeven Points:')
+    assert output[3] == f'Max Profit: {order_options.max_profit()}'
+    assert output[4] == f'Max Loss: {order_options.max_loss()}'
+
+    main([str(strategies_csv), '--strategies', '--chunk-size', '2'])
+    output = capsys.readouterr().out.splitlines()
+    assert [line.split(':')[0] for line in output] == [f'Strategy {strategy}' for strategy in _expected()]
+    prices = [float(line.split('Price: ')[1].split(' ')[0]) for line in output]
+    assert np.allclose(prices, [price for price, breakeven_points in _expected().values()])
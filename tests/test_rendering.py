@@ -0,0 +1,28 @@
+import numpy as np
+from breakthrough import Breakthrough
+from rendering import render_batch
+
+LEGS = ((4000, 4000, 50, 'long', 'call'), (4000, 4000, 50, 'long', 'put'))
+
+def test_render_batch_format_follows_the_extension(tmp_path):
+    svg, png = tmp_path / 'o.svg', tmp_path / 'o.png'
+    render_batch([(Breakthrough(*LEGS), str(svg)), (Breakthrough(*LEGS), str(png)), (Breakthrough(*LEGS), None)])
+    assert b'<svg' in svg.read_bytes()[:500]
+    assert png.read_bytes().startswith(b'\x89PNG')
+
+def test_render_batch_in_memory_defaults_to_png():
+    output, = render_batch([(Breakthrough(*LEGS), None)])
+    assert output.startswith(b'\x89PNG')
+
+def test_template_shades_zero_payoff_like_plot():
+    from rendering import PayoffTemplate
+    data = Breakthrough(*LEGS).curve_data()
+    assert data['zero_is_profit']
+    data.update(underlying_range=np.arange(5.0), payoffs=np.array([-1.0, 0.0, 0.0, 0.0, 1.0]))
+    template = PayoffTemplate()
+    template.draw(data)
+    # Flat zero payoff counts as profit for Breakthrough, as in Breakthrough.plot()
+    assert template.fills[1].get_paths()[0].vertices[:, 0].min() == 1.0
+    data['zero_is_profit'] = False
+    template.draw(data)
+    assert template.fills[1].get_paths()[0].vertices[:, 0].min() == 4.0
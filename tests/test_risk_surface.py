@@ -0,0 +1,30 @@
+import tracemalloc
+import numpy as np
+from order_options import OrderOptions
+from risk_surface import RiskSurface
+
+def _surface(n_legs=50):
+    rng = np.random.default_rng(0)
+    position = OrderOptions.from_arrays(4000, rng.uniform(3500, 4500, n_legs).round(), rng.uniform(10, 200, n_legs),
+                                        rng.choice(['long', 'short'], n_legs), rng.choice(['call', 'put'], n_legs))
+    return RiskSurface(position, np.linspace(3000, 5000, 2048), np.linspace(-0.2, 0.2, 64), [0.0, 0.05], 0.1, 0.2)
+
+def test_tiles_stay_within_the_memory_budget():
+    reference = _surface().compute(max_bytes=2**30)
+    for max_bytes in (2**20, 2**24):
+        surface = _surface()
+        tracemalloc.start()
+        try:
+            cube = surface.compute(max_bytes=max_bytes)
+            peak = tracemalloc.get_traced_memory()[1] - cube.nbytes
+        finally:
+            tracemalloc.stop()
+        assert peak <= max_bytes
+        assert np.allclose(cube, reference)
+
+def test_tiles_leave_room_for_a_vectorized_leg_chunk():
+    from risk_surface import _MIN_LEG_CHUNK, _leg_chunk
+    surface = _surface()
+    t, vols = next(surface._tiles(2**24))
+    assert vols.stop - vols.start > 1
+    assert _leg_chunk((vols.stop - vols.start) * surface.spots.size, 2**24) >= _MIN_LEG_CHUNK
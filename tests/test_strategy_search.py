@@ -0,0 +1,51 @@
+import itertools
+import numpy as np
+import pytest
+from black_scholes import BlackScholes
+from strategy_search import OBJECTIVES, SHAPES, SYMMETRIC, OptionChain, StrategyScanner
+
+def _chain(n_strikes=24):
+    strikes = np.linspace(3400, 4600, n_strikes)
+    # A smile keeps the chain from being perfectly regular
+    sigma = 0.2 + 0.3 * ((strikes - 4000) / 4000) ** 2
+    calls = BlackScholes(strikes, 0.1, sigma, 0.01, True).value(4000)
+    puts = BlackScholes(strikes, 0.1, sigma, 0.01, False).value(4000)
+    return OptionChain(4000, strikes, calls, puts)
+
+def _brute_force(scanner):
+    # Scores of the top list from scoring every index tuple with no pruning
+    chain = scanner.chain
+    scores = []
+    for name in scanner.shapes:
+        n_slots = max(slot for slot, is_long, is_call in SHAPES[name]) + 1
+        index = np.array(list(itertools.combinations(range(len(chain)), n_slots)), dtype=np.int64)
+        if name in SYMMETRIC:
+            index = index[index[:, 2] - index[:, 1] == index[:, 1] - index[:, 0]]
+        if scanner.max_wing is not None:
+            index = index[np.all(np.diff(index, axis=1) <= scanner.max_wing, axis=1)]
+        batch, net_debit = scanner._batch(name, index)
+        max_loss, max_profit = batch.max_loss(), batch.max_profit()
+        keep = np.ones(len(batch), dtype=bool)
+        if scanner.max_net_debit is not None:
+            keep &= net_debit <= scanner.max_net_debit
+        if scanner.max_loss_limit is not None:
+            keep &= max_loss >= -scanner.max_loss_limit
+        score = OBJECTIVES[scanner.objective](batch, max_loss, max_profit)
+        scores.append(score[keep & ~np.isnan(score)])
+    return np.sort(np.concatenate(scores))[::-1][:scanner.top]
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'max_net_debit': 20},
+    {'shapes': ['iron_condor', 'long_call_condor', 'bull_call_spread']},
+    {'shapes': ['iron_condor', 'long_put_butterfly'], 'max_net_debit': 0},
+    {'objective': 'max_loss', 'max_wing': 6},
+    {'objective': 'reward_risk', 'max_loss_limit': 150, 'shapes': ['long_call_condor', 'bear_put_spread']},
+    {'objective': 'breakeven_width', 'max_loss_limit': 100, 'max_wing': 4},
+])
+def test_pruned_scan_matches_brute_force(options):
+    scanner = StrategyScanner(_chain(), top=10, **options)
+    scores = np.array([result['score'] for result in scanner.scan()])
+    expected = _brute_force(scanner)
+    assert scores.size == expected.size
+    assert np.allclose(scores, expected, rtol=1e-9, atol=1e-9) or np.array_equal(scores, expected)
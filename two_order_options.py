@@ -3,11 +3,28 @@ import matplotlib.pyplot as plt
 from plain_vanilla_options import PlainVanillaOptions
 from call_spread import CallSpread
 from debit_spread import DebitSpread
+from strategy_core import StrategyCore
 
 class TwoOptions():
     def __init__(self, option1, option2):
-        self.call_spread = CallSpread(option1, option2)
-        self.debit_spread = DebitSpread(option1, option2)
+        # Both spreads are views over one core, built only when first used
+        self.option1 = option1
+        self.option2 = option2
+        self.core = StrategyCore(option1, option2)
+        self._call_spread = None
+        self._debit_spread = None
+
+    @property
+    def call_spread(self):
+        if self._call_spread is None:
+            self._call_spread = CallSpread(self.option1, self.option2, core=self.core)
+        return self._call_spread
+
+    @property
+    def debit_spread(self):
+        if self._debit_spread is None:
+            self._debit_spread = DebitSpread(self.option1, self.option2, core=self.core)
+        return self._debit_spread
 if __name__ == '__main__':
     
     option1 = (4000, 4200, 90, 'short', 'call')